@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Compare `inkfill` servers under concurrent load.
+
+Usage: server.py [--requests=<n>] [--clients=<n>] [--sections=<n>] [<server>...]
+
+Options:
+  --requests=<n>    requests per server [default: 200]
+  --clients=<n>     concurrent clients [default: 8]
+  --sections=<n>    sections in the slow document [default: 2000]
+  <server>          servers to compare (default: wsgiref threaded)
+"""
+
+# std
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from time import sleep
+from typing import Dict
+from typing import List
+from urllib.request import urlopen
+import json
+import socket
+import subprocess
+import sys
+
+# lib
+from docopt import docopt
+
+TEMPLATE = """{% extends "inkfill-base.html.j2" %}
+{% block content %}
+{{ xref.push() }}
+{% for n in range(config.sections) %}
+<p>{{ xref.up("Section " ~ n) }} {{ n | say_number }} {{ n | dollars }}</p>
+{% endfor %}
+{% endblock %}
+"""
+
+
+def free_port() -> int:
+    """Return an unused TCP port."""
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return int(s.getsockname()[1])
+
+
+def fetch(url: str) -> float:
+    """Return seconds to fetch `url`."""
+    start = perf_counter()
+    with urlopen(url, timeout=120) as res:
+        res.read()
+    return perf_counter() - start
+
+
+def bench(server: str, config: Path, requests: int, clients: int) -> Dict[str, float]:
+    """Return timings for a single server."""
+    port = free_port()
+    cmd = [sys.executable, "-m", "inkfill", "--cache-size=0"]
+    cmd += [f"--server={server}", f"--port={port}", f"--workers={clients}", str(config)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        url = f"http://localhost:{port}"
+        for _ in range(100):
+            try:
+                fetch(url)
+                break
+            except OSError:
+                sleep(0.1)
+
+        # every 4th request is the slow document
+        urls = [f"{url}/doc/0" if i % 4 == 0 else url for i in range(requests)]
+        start = perf_counter()
+        with ThreadPoolExecutor(clients) as pool:
+            times = list(pool.map(fetch, urls))
+        total = perf_counter() - start
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    fast = sorted(t for u, t in zip(urls, times) if not u.endswith("/doc/0"))
+    return {
+        "requests_per_second": round(requests / total, 2),
+        "fast_p50_ms": round(fast[len(fast) // 2] * 1000, 2),
+        "fast_p95_ms": round(fast[int(len(fast) * 0.95)] * 1000, 2),
+    }
+
+
+def main(argv: List[str]) -> None:
+    """Run the benchmark."""
+    args = docopt(__doc__, argv=argv)
+    with TemporaryDirectory() as tmp:
+        config = Path(tmp) / "bench.toml"
+        (Path(tmp) / "bench.html.j2").write_text(TEMPLATE)
+        config.write_text(
+            "[[document]]\n"
+            'template = "bench.html.j2"\n'
+            f"sections = {int(args['--sections'])}\n"
+        )
+        results = {
+            server: bench(
+                server, config, int(args["--requests"]), int(args["--clients"])
+            )
+            for server in args["<server>"] or ["wsgiref", "threaded"]
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
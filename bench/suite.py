@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+"""Benchmark `inkfill` numerals, filters, cross-references, and rendering.
+
+Usage:
+  suite.py compare [--threshold=<pct>] <baseline> <current>
+  suite.py [options] [<name>...]
+
+Options:
+  --sections=<n>      sections in the synthetic contract [default: 500]
+  --depth=<n>         nesting depth of the contract sections [default: 3]
+  --terms=<n>         term references in the contract [default: 200]
+  --docs=<n>          documents in the synthetic config [default: 100]
+  --repeat=<n>        timing runs per benchmark [default: 5]
+  -o, --out=<file>    write results to a file instead of stdout
+  --threshold=<pct>   percent slowdown reported as a regression [default: 10]
+  <name>              benchmarks to run (default: all)
+  <baseline>          results file to compare against
+  <current>           results file to compare
+
+Results are JSON: seconds per call (`min` and `median` of `--repeat` runs)
+for each benchmark, plus the parameters that produced them. `compare` exits
+with status 1 if any benchmark is slower than `--threshold`.
+"""
+
+# std
+from contextlib import redirect_stdout
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from timeit import Timer
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from wsgiref.util import setup_testing_defaults
+import io
+import json
+import platform
+import subprocess
+import sys
+
+# lib
+from attrbox import AttrDict
+from docopt import docopt
+
+# pkg
+from inkfill import __main__ as server
+from inkfill import plural
+from inkfill import Refs
+from inkfill import to_cardinal
+from inkfill import to_ordinal
+from inkfill import to_roman
+
+CONTRACT = """{% extends "inkfill-base.html.j2" %}
+{% block content %}
+{% set ns = namespace(depth=0) %}
+{% for n in range(config.sections) %}
+{% set depth = 1 + n % config.depth %}
+{% if depth > ns.depth %}{{ xref.push() }}
+{% else %}{{ xref.pop(ns.depth - depth) }}{% endif %}
+{% set ns.depth = depth %}
+<p>{{ xref.up("Clause " ~ n) }} {{ n | say_number }} {{ n | dollars }}</p>
+{% endfor %}
+{{ xref.pop(ns.depth) }}
+{% for n in range(config.terms) %}
+<p>{{ xref.term("Term " ~ n % 50) }} {{ ("widget " ~ n % 50) | plural }}</p>
+{% endfor %}
+{% endblock %}
+"""
+"""Synthetic contract with nested sections and term references."""
+
+WORDS = ["box", "church", "city", "day", "index", "analysis", "datum", "cactus"]
+WORDS += ["criterion", "sheep", "child", "stop", "cliff", "taxi", "quiz", "wife"]
+"""Words with a variety of plural rules."""
+
+Bench = Callable[[], Any]
+"""Function to time."""
+
+
+def setup_server(tmp: Path, params: AttrDict) -> None:
+    """Write the synthetic config and load it into the server."""
+    (tmp / "contract.html.j2").write_text(CONTRACT)
+    (tmp / "letter.html.j2").write_text("{{ config.greeting }} {{ config.name }}")
+    lines = [
+        'name = "Acme"',
+        'greeting = "Dear {{ name }},"',
+        "[[document]]",
+        'template = "contract.html.j2"',
+        f"sections = {params.sections}",
+        f"depth = {params.depth}",
+        f"terms = {params.terms}",
+    ]
+    for n in range(params.docs):
+        lines += [
+            "[[document]]",
+            'template = "letter.html.j2"',
+            f'name = "Customer {n}"',
+            f'title = "Letter to {{{{ name }}}} ({n})"',
+        ]
+    config = tmp / "bench.toml"
+    config.write_text("\n".join(lines))
+
+    server.args = AttrDict(config=config, cache_dir=tmp / "cache")
+    server.rendered.max_size = 0  # measure rendering, not caching
+    server.setup_config()
+    server.setup_jinja()
+
+
+def doc_render() -> bytes:
+    """Request the contract through the WSGI app."""
+    server.docs.clear()  # resolve the config on every request
+    environ: Dict[str, Any] = {"PATH_INFO": "/doc/0", "wsgi.errors": io.StringIO()}
+    setup_testing_defaults(environ)
+    body = server.app(environ, lambda *_: None)
+    return b"".join(body)
+
+
+def doc_config() -> None:
+    """Resolve every document config."""
+    server.docs.clear()
+    for idx in range(len(server.config.document)):
+        server.get_doc(idx)
+
+
+def refs_push_up(params: AttrDict) -> Bench:
+    """Return a function that defines the contract's sections."""
+
+    def run() -> None:
+        refs = Refs()
+        depth = 0
+        for n in range(params.sections):
+            level = 1 + n % params.depth
+            if level > depth:
+                refs.push()
+            else:
+                refs.pop(depth - level)
+            depth = level
+            refs.up(f"Clause {n}")
+            refs.current.refer()
+        for n in range(params.terms):
+            refs.term(f"Term {n % 50}").refer()
+
+    return run
+
+
+def convert_nested_str() -> Bench:
+    """Return a function that interpolates a nested config."""
+    item = {
+        "party": {"name": "{{ name }}", "title": "{{ name | upper }} Inc."},
+        "lines": [f"line {n} for {{{{ name }}}}" for n in range(50)],
+        "plain": [f"line {n}" for n in range(50)],
+    }
+    context = AttrDict(name="Acme")
+    return lambda: server.convert_nested_str(json.loads(json.dumps(item)), context)
+
+
+def benchmarks(params: AttrDict) -> Dict[str, Bench]:
+    """Return benchmark names mapped to functions (server must be set up)."""
+    big = [10**n + 7 * n for n in range(36)]
+    return {
+        "to_cardinal": lambda: [to_cardinal(n) for n in range(0, 10**6, 997)],
+        "to_cardinal_big": lambda: [to_cardinal(n) for n in big],
+        "to_ordinal": lambda: [to_ordinal(n) for n in range(1000)],
+        "to_roman": lambda: [to_roman(n) for n in range(1, 4000)],
+        "plural": lambda: [plural(w) for w in WORDS * 50],
+        "refs_push_up": refs_push_up(params),
+        "convert_nested_str": convert_nested_str(),
+        "doc_config": doc_config,
+        "doc_render": doc_render,
+    }
+
+
+def measure(func: Bench, repeat: int) -> Dict[str, float]:
+    """Return seconds per call for `func`."""
+    timer = Timer(func)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat, number)]
+    return {"min": min(times), "median": median(times), "number": number}
+
+
+def commit() -> str:
+    """Return the current git commit or an empty string."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            cwd=Path(__file__).parent,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the selected benchmarks."""
+    params = AttrDict(
+        sections=int(args["--sections"]),
+        depth=int(args["--depth"]),
+        terms=int(args["--terms"]),
+        docs=int(args["--docs"]),
+    )
+    results: Dict[str, Any] = {}
+    with TemporaryDirectory() as tmp:
+        with redirect_stdout(sys.stderr):  # keep stdout for results
+            setup_server(Path(tmp), params)
+        funcs = benchmarks(params)
+        for name in args["<name>"] or funcs:
+            if name not in funcs:
+                sys.exit(f"unknown benchmark: {name} (choose from {', '.join(funcs)})")
+            results[name] = measure(funcs[name], int(args["--repeat"]))
+            print(f"{name:20} {results[name]['min'] * 1000:10.3f} ms", file=sys.stderr)
+
+    return {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "params": params,
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> int:
+    """Print the change in each benchmark; return the number of regressions."""
+    regressions = 0
+    print(f"{'benchmark':20} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before, after = baseline["results"][name]["min"], result["min"]
+        change = (after - before) / before * 100
+        flag = ""
+        if change > threshold:
+            regressions += 1
+            flag = "  slower"
+        print(
+            f"{name:20} {before * 1000:9.3f} ms {after * 1000:9.3f} ms"
+            f" {change:+7.1f}%{flag}"
+        )
+    return regressions
+
+
+def main(argv: List[str]) -> None:
+    """Run or compare benchmarks."""
+    args = docopt(__doc__, argv=argv)
+    if args["compare"]:
+        baseline = json.loads(Path(args["<baseline>"]).read_text())
+        current = json.loads(Path(args["<current>"]).read_text())
+        sys.exit(1 if compare(baseline, current, float(args["--threshold"])) else 0)
+
+    text = json.dumps(run(args), indent=2)
+    if args["--out"]:
+        Path(args["--out"]).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
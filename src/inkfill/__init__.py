@@ -15,12 +15,14 @@ from .numerals import to_roman
 from .filters import compound
 from .filters import day_month_year
 from .filters import dollars
+from .filters import format_column
 from .filters import month_day_year
 from .filters import nth_of_month_year
 from .filters import one_or_many
 from .filters import plural
 from .filters import spell_number
 from .filters import USD
+from .filters import USD_many
 
 from .xref import Division
 from .xref import Ref
@@ -49,10 +51,12 @@ __all__ = [
     "month_day_year",
     "day_month_year",
     "dollars",
+    "format_column",
     "plural",
     "one_or_many",
     "spell_number",
     "USD",
+    "USD_many",
     # xref
     "Division",
     "Ref",
@@ -2,55 +2,122 @@
 # type: ignore
 """Generate documents using configurable templates.
 
-Usage: inkfill [--help | --version] [--debug] <config>
+Usage:
+  inkfill [--help | --version]
+  inkfill [options] <config>
+  inkfill build [options] <config>
+  inkfill compile [options] <config>
+  inkfill merge [options] <config> <data>
+
+Commands:
+  build                         render every document to an HTML file
+  compile                       precompile every template into the cache
+  merge                         render one document per row of a CSV or
+                                JSON Lines file
 
 Options:
   -h, --help                    show this message and exit
   --version                     show program version and exit
-  --debug                       show debug messages
+  --debug                       show debug messages and profile renders
+  --profile                     report where render time goes
+  -j, --jobs=<n>                number of parallel jobs; 0 = one per CPU [default: 0]
+  -o, --out=<dir>               output directory [default: build]
+  --cache-size=<mb>             rendered document cache size in MB [default: 64]
+  --cache-dir=<dir>             compiled template cache directory
+                                (default: $INKFILL_CACHE or ~/.cache/inkfill)
+  --host=<host>                 address to listen on [default: localhost]
+  --port=<port>                 port to listen on [default: 8080]
+  --server=<name>               `threaded` or any `bottle` server [default: threaded]
+  --workers=<n>                 number of concurrent requests [default: 8]
+  --stream                      send documents while they render
+  --two-pass                    resolve forward references on the server
+  --doc=<n>                     document to merge rows into [default: 0]
+  --stdout                      write merged documents to stdout
+  --refs=<dir>                  save and read a cross-document reference
+                                index in this directory
   <config>                      configuration file
+  <data>                        merge data file (`.csv` or `.jsonl`)
 """
 # std
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
 from datetime import datetime
-from datetime import timedelta
+from email.utils import formatdate
+from functools import lru_cache
 from os import environ as ENV
 from pathlib import Path
+from threading import RLock
 from typing import Any
 from typing import cast
 from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
 from typing import TypeVar
 from typing import Union
+import csv
+import hashlib
 import json
+import os
+import shutil
+import sys
+import zlib
 
 # lib
 from attrbox import AttrDict
 from attrbox import load_config
 from attrbox import parse_docopt
+from bottle import abort
 from bottle import Bottle
+from bottle import HTTPResponse
+from bottle import request
+from bottle import response
 from bottle import static_file
 from jinja2 import Environment
+from jinja2 import FileSystemBytecodeCache
 from jinja2 import FileSystemLoader
+from jinja2 import meta
+from jinja2 import pass_environment
 from jinja2 import StrictUndefined
-from timeloop import Timeloop
+from jinja2 import Template
+from jinja2 import TemplateSyntaxError
+from jinja2.environment import TemplateStream
 import bottle
 
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
 # pkg
 from . import __version__
 from . import commafy
 from . import compound
 from . import day_month_year
 from . import dollars
+from . import format_column
 from . import month_day_year
 from . import nth_of_month_year
 from . import NumFormat
 from . import one_or_many
 from . import plural
 from . import Refs
+from . import slugify
 from . import spell_number
+from . import timing
 from . import to_cardinal
 from . import USD
+from .cache import LRUCache
+from .deps import DepGraph
+from .less import compile_less
+from .less import has_compiler
+from .profiling import ProfilingEnvironment
+from .serve import WORKER_OPTIONS
+from .watch import Watcher
 
 T = TypeVar("T")
 """Generic type variable."""
@@ -58,6 +125,15 @@ T = TypeVar("T")
 PATH_VIEWS = Path(__file__).parent.resolve() / "views"
 """Path to views."""
 
+TEMPLATE_EXTENSIONS = ["j2", "jinja", "jinja2"]
+"""File extensions that `inkfill compile` treats as templates."""
+
+STREAM_BUFFER = 100
+"""Number of template output pieces to join into each streamed chunk."""
+
+RUNTIME_KEYS = ["args", "document", "mtime", "now"]
+"""Top-level config keys that are set by `inkfill` rather than loaded."""
+
 bottle.debug(True)
 app = Bottle()
 """`bottle` web server."""
@@ -71,8 +147,44 @@ config = None
 renderer = None
 """`jinja2` environment."""
 
-tl = Timeloop()
-"""`timeloop` periodic scheduler."""
+watcher: Optional[Watcher] = None
+"""Watches the config, its imports, and the template directories."""
+
+rendered: LRUCache[Tuple[Any, ...], Union[str, bytes]] = LRUCache(
+    64 * 2**20, sys.getsizeof
+)
+"""Rendered (and compressed) documents keyed by their inputs."""
+
+docs: Dict[int, AttrDict] = {}
+"""Interpolated document configs for the current config."""
+
+ref_index: Dict[Path, Tuple[float, Dict[str, Dict[str, str]]]] = {}
+"""Reference index files mapped to their mtime and exported references."""
+
+graph = DepGraph()
+"""Documents mapped to the files and config keys they depend on."""
+
+lock = RLock()
+"""Guards `config`, `docs`, and `graph` across request threads."""
+
+
+@app.hook("before_request")
+def start_timing() -> None:
+    """Start timing the phases of a request."""
+    timing.start()
+
+
+@app.hook("after_request")
+def stop_timing() -> None:
+    """Report request phases in a `Server-Timing` header (and log in debug mode)."""
+    timings = timing.stop()
+    if not timings or not timings.phases:
+        return
+
+    timings.phases["total"] = timings.total()
+    response.set_header("Server-Timing", timings.header())
+    if args and args.debug:
+        print(f"[inkfill] {request.method} {request.path} {timings}")
 
 
 @app.route("/static/<path>")
@@ -81,12 +193,34 @@ def static(path: str):
     return static_file(path, root=PATH_VIEWS / "static")
 
 
+@app.route("/css/<path:path>")
+def stylesheet(path: str) -> str:
+    """Serve a LESS stylesheet compiled to CSS."""
+    source = find_less(path)
+    css = source and compile_less(source)
+    if css is None:
+        abort(404, f"Cannot compile stylesheet: {path}")
+    response.content_type = "text/css; charset=UTF-8"
+    return css
+
+
+def find_less(path: str) -> Optional[Path]:
+    """Return the LESS file for a stylesheet in the static or template paths."""
+    name = Path(path).with_suffix(".less")
+    for root in [PATH_VIEWS / "static", *renderer.loader.searchpath]:
+        root = Path(root).resolve()
+        source = (root / name).resolve()
+        if root in source.parents and source.is_file():  # no escaping `root`
+            return source
+    return None
+
+
 @app.route("/")
 def doc_list() -> str:
     """List of possible documents."""
     result = "<ul>"
-    for idx, doc in enumerate(config.document):
-        doc = doc_config(config, idx)
+    for idx, _ in enumerate(config.document):
+        doc = get_doc(idx)
         title = doc.title or f"Untitled Document {(idx + 1)}"
         result += f"""<li><a href="/doc/{idx}">{title}</a></li>"""
     result += "</ul>"
@@ -94,37 +228,540 @@ def doc_list() -> str:
 
 
 @app.route("/doc/<idx:int>")
-def doc_render(idx: int) -> str:
+def doc_render(idx: int) -> Union[str, bytes, Iterator[bytes]]:
     """Render the nth document."""
-    doc = doc_config(config, idx)
-    tmpl = renderer.get_template(doc.template)
-    return cast(str, tmpl.render(config=doc, xref=Refs(), Refs=Refs))
+    encoding = choose_encoding(request.get_header("Accept-Encoding", ""))
+    key = doc_key(idx)
+    if is_not_modified(doc_etag(key, encoding)):
+        raise HTTPResponse(status=304, headers=doc_headers(key, encoding))
+
+    with timing.phase("cache"):
+        html = rendered.get(key)
+    if html is None:
+        doc = get_doc(idx)
+        with timing.phase("deps"):
+            templates = find_templates(doc.template)  # outside the lock
+            with lock:
+                graph.add(idx, *templates)
+            paths = doc_inputs(idx)
+            key = doc_key(idx, paths)  # before rendering so later edits cause a miss
+        if args.stream:
+            set_headers(doc_headers(key, encoding), encoding)
+            return stream_doc(key, doc, encoding, idx, paths)
+        html = render(doc, idx)
+        key = rendered_key(idx, key, paths)
+        html = rendered.put(key, html)
+
+    set_headers(doc_headers(key, encoding), encoding)
+    if encoding == "identity":
+        return html
+
+    body = rendered.get((key, encoding))
+    if body is None:
+        with timing.phase("compress"):
+            body = compress(html.encode(), encoding)
+        rendered.put((key, encoding), body)
+    return body
+
+
+def set_headers(headers: Dict[str, str], encoding: str) -> None:
+    """Set the response headers for a document."""
+    for name, value in headers.items():
+        response.set_header(name, value)
+    if encoding != "identity":
+        response.set_header("Content-Encoding", encoding)
+
+
+def stream_doc(
+    key: Tuple[Any, ...],
+    doc: AttrDict,
+    encoding: str,
+    idx: Optional[int] = None,
+    paths: Iterable[Path] = (),
+) -> Iterator[bytes]:
+    """Yield a document as it renders and cache it if it fits."""
+    parts: Optional[List[str]] = []
+    size = 0
+
+    def tee(chunks: Iterable[str]) -> Iterator[bytes]:
+        nonlocal parts, size
+        for chunk in chunks:
+            if parts is not None:
+                parts.append(chunk)
+                size += len(chunk)
+                if size > rendered.max_size:
+                    parts = None  # too big to cache; stop keeping a copy
+            yield chunk.encode()
+
+    body = tee(render_stream(doc, idx))
+    yield from body if encoding == "identity" else compress_stream(body, encoding)
+    report_profile(doc.template)
+    if parts is not None:
+        if idx is not None:
+            key = rendered_key(idx, key, paths)
+        rendered.put(key, "".join(parts))
+
+
+@app.route("/cache")
+def cache_stats() -> Dict[str, int]:
+    """Rendered document cache counters."""
+    return rendered.stats()
+
+
+def mtime(path: Path) -> float:
+    """Return the modification time of `path` or `0` if it is missing."""
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0
+
+
+def doc_inputs(idx: int) -> List[Path]:
+    """Return the files the nth document depends on (sorted)."""
+    with lock:
+        return sorted(p for p in graph.inputs.get(idx, []) if isinstance(p, Path))
+
+
+def doc_key(idx: int, paths: Optional[Iterable[Path]] = None) -> Tuple[Any, ...]:
+    """Return a cache key for the nth document based on its inputs (or `paths`)."""
+    paths = doc_inputs(idx) if paths is None else paths
+    return (idx, graph.version(idx), config.now, *(mtime(p) for p in paths))
+
+
+def rendered_key(
+    idx: int, key: Tuple[Any, ...], paths: Iterable[Path]
+) -> Tuple[Any, ...]:
+    """Return the key to cache a render under.
+
+    Rendering can add inputs (e.g., reference index files), so the key is
+    recomputed unless an input from before the render (`paths`) changed
+    during it; then `key` is kept so the next request misses.
+    """
+    return doc_key(idx) if doc_key(idx, paths) == key else key
+
+
+def doc_etag(key: Tuple[Any, ...], encoding: str = "identity") -> str:
+    """Return a strong `ETag` for a document's render inputs and encoding."""
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:20]
+    return f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+
+
+def doc_headers(key: Tuple[Any, ...], encoding: str) -> Dict[str, str]:
+    """Return the caching headers for a rendered document."""
+    return {
+        "ETag": doc_etag(key, encoding),
+        "Last-Modified": formatdate(max(config.mtime, *key[3:]), usegmt=True),  # mtimes
+        "Cache-Control": "no-cache",  # always revalidate
+        "Vary": "Accept-Encoding",
+    }
+
+
+def is_not_modified(etag: str) -> bool:
+    """Return `True` if the request's `If-None-Match` matches `etag`."""
+    header = request.get_header("If-None-Match", "")
+    tags = [tag.strip().replace("W/", "", 1) for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def choose_encoding(accept: str) -> str:
+    """Return the preferred supported encoding from an `Accept-Encoding` header."""
+    weights: Dict[str, float] = {}
+    for part in accept.split(","):
+        name, _, param = part.partition(";")
+        param = param.strip()
+        try:
+            weight = float(param[2:]) if param.startswith("q=") else 1.0
+        except ValueError:
+            weight = 0
+        weights[name.strip().lower()] = weight
+
+    supported = ["br", "gzip"] if brotli and not (args and args.stream) else ["gzip"]
+    for encoding in supported:  # streamed brotli isn't byte-stable
+        if weights.get(encoding, weights.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Return `data` compressed with `encoding` (`br` or `gzip`)."""
+    return b"".join(compress_stream([data], encoding))
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Yield `chunks` compressed with `encoding` (`br` or `gzip`)."""
+    if encoding == "br":
+        compressor = brotli.Compressor()
+        process, finish = compressor.process, compressor.finish
+    else:  # gzip with a zero timestamp so the output is byte-stable
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def find_imports(doc: AttrDict) -> List[Path]:
+    """Return the files imported (directly or indirectly) by a document."""
+    found: List[Path] = []
+    todo = [(args.config.parent / p).resolve() for p in doc.imports or []]
+    while todo:
+        path = todo.pop(0)
+        if path in found:
+            continue
+        found.append(path)
+        data = load_config(path, load_imports=False)
+        todo.extend((path.parent / p).resolve() for p in data.get("imports", []))
+    return found
+
+
+def find_templates(name: str) -> List[Path]:
+    """Return the files for a template and the templates it references."""
+    found: List[Path] = []
+    todo, done = [name], set()
+    while todo:
+        name = todo.pop(0)
+        if name in done:
+            continue
+        done.add(name)
+        _, filename, _ = renderer.loader.get_source(renderer, name)
+        path = Path(filename)
+        found.append(path)
+        todo.extend(referenced_templates(path, mtime(path)))
+    return found
+
+
+@lru_cache(maxsize=1024)
+def referenced_templates(path: Path, modified: float) -> Tuple[str, ...]:
+    """Return the templates a template file references (memoized by mtime)."""
+    source = path.read_text(encoding="utf-8")
+    return tuple(
+        ref
+        for ref in meta.find_referenced_templates(renderer.parse(source))
+        if ref  # skip dynamic references
+    )
+
+
+def render(doc: AttrDict, idx: Optional[int] = None) -> str:
+    """Render a document using its interpolated config.
+
+    If `idx` is given, the document's references are saved to the index.
+    """
+    with timing.phase("template"):
+        tmpl = renderer.get_template(doc.template)
+    with timing.phase("render"):
+        refs = make_refs(tmpl, doc)
+        html = cast(str, tmpl.render(config=doc, xref=refs, Refs=Refs))
+    save_refs(refs, idx)
+    report_profile(doc.template)
+    return html
+
+
+def render_stream(doc: AttrDict, idx: Optional[int] = None) -> TemplateStream:
+    """Return a stream of rendered chunks for a document.
+
+    If `idx` is given, the document's references are saved to the index
+    once the stream is done.
+    """
+    with timing.phase("template"):
+        tmpl = renderer.get_template(doc.template)
+    refs = make_refs(tmpl, doc)
+    chunks = tmpl.generate(config=doc, xref=refs, Refs=Refs)
+    stream = TemplateStream(saving_refs(chunks, refs, idx))
+    stream.enable_buffering(STREAM_BUFFER)
+    return stream
+
+
+def saving_refs(chunks: Iterator[str], refs: Refs, idx: Optional[int]) -> Iterator[str]:
+    """Yield rendered chunks, then save the document's references."""
+    yield from chunks
+    save_refs(refs, idx)
+
+
+def doc_name(idx: int) -> str:
+    """Return the name of the nth document (used for files and the index)."""
+    doc = get_doc(idx)
+    return slugify(doc.title or f"document-{idx + 1}")
+
+
+def save_refs(refs: Refs, idx: Optional[int]) -> Optional[Path]:
+    """Save the nth document's definitions to the reference index.
+
+    The index files the document read become inputs of its cache key, so
+    it re-renders when a document it cites changes.
+    """
+    if idx is None or not (args and args.refs):
+        return None
+
+    with lock:
+        graph.add(idx, *(Path(args.refs) / f"{name}.json" for name in refs.documents))
+
+    doc = get_doc(idx)
+    name = doc_name(idx)
+    href = (doc.output or f"{name}.html") if args.build else f"/doc/{idx}"
+    path = args.refs / f"{name}.json"
+    text = json.dumps(refs.export(name, href), indent=2)
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return path  # unchanged; keep the mtime so citing documents stay cached
+    except OSError:
+        pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")  # readers never see a partial file
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def load_refs() -> Dict[str, Dict[str, Dict[str, str]]]:
+    """Return the reference index (re-reading only changed files)."""
+    if not (args and args.refs):
+        return {}
+
+    result = {}
+    with lock:
+        for path in sorted(Path(args.refs).glob("*.json")):
+            modified = mtime(path)
+            cached = ref_index.get(path)
+            if cached is None or cached[0] != modified:
+                try:
+                    cached = (modified, json.loads(path.read_text(encoding="utf-8")))
+                except (OSError, ValueError):
+                    continue  # removed or being replaced
+                ref_index[path] = cached
+            result[path.stem] = cached[1]
+    return result
+
+
+def report_profile(name: str) -> None:
+    """Print and reset the render profile (if profiling)."""
+    if isinstance(renderer, ProfilingEnvironment):
+        print(f"[inkfill] profile of {name}:\n{renderer.profiler.report()}")
+        renderer.profiler.reset()
+
+
+def make_refs(tmpl: Template, doc: AttrDict) -> Refs:
+    """Return a reference manager for rendering a document.
+
+    With `--two-pass`, the document is rendered once (and discarded) to
+    collect every definition so forward references can be resolved.
+    """
+    index = load_refs()
+    if not (args and args.two_pass):
+        return Refs(index=index)
+
+    first = Refs(index=index)
+    for _ in tmpl.generate(config=doc, xref=first, Refs=Refs):
+        pass
+    return Refs(resolved=first.store, index=index)
+
+
+def output_path(idx: int) -> Path:
+    """Return the file the nth document is built to."""
+    return args.out / (get_doc(idx).output or f"{doc_name(idx)}.html")
+
+
+def check_outputs(indexes: Iterable[int]) -> None:
+    """Raise `ValueError` if two documents would be built to the same file."""
+    seen: Dict[Path, int] = {}
+    for idx in indexes:
+        path = output_path(idx).resolve()
+        if path in seen:
+            raise ValueError(
+                f"documents {seen[path]} and {idx} both write {path}"
+                " (set a unique `title` or `output`)"
+            )
+        seen[path] = idx
+
+
+def build_doc(idx: int) -> Path:
+    """Render the nth document to a file in the output directory."""
+    doc = get_doc(idx)
+    path = output_path(idx)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    render_stream(doc, idx).dump(str(path), encoding="utf-8")
+    report_profile(str(path))
+    return path
+
+
+def build_styles() -> List[Path]:
+    """Compile the base and config-directory stylesheets to the output directory."""
+    paths = []
+    sources = [PATH_VIEWS / "static" / "inkfill.less"]
+    sources.extend(args.config.parent.glob("*.less"))
+    for source in sources:
+        css = compile_less(source)
+        if css is not None:
+            path = args.out / "css" / source.with_suffix(".css").name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(css, encoding="utf-8")
+            paths.append(path)
+    return paths
+
+
+def init_worker(parent_args: AttrDict, now: datetime) -> None:
+    """Set up a build worker process."""
+    global args
+    args = parent_args
+    setup_config(now=now)
+    setup_jinja()
+
+
+def build() -> List[Path]:
+    """Render every document, in parallel if possible."""
+    check_outputs(range(len(config.document)))  # before writing anything
+    args.out.mkdir(parents=True, exist_ok=True)
+    shutil.copytree(PATH_VIEWS / "static", args.out / "static", dirs_exist_ok=True)
+    build_styles()
+
+    indexes = range(len(config.document))
+    jobs = min(int(args.jobs or 0) or os.cpu_count() or 1, len(indexes))
+    if jobs <= 1:
+        paths = [build_doc(idx) for idx in indexes]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=init_worker, initargs=(args, config.now)
+        ) as pool:
+            paths = list(pool.map(build_doc, indexes))
+
+    for path in paths:
+        print(f"[inkfill] wrote {path}")
+    return paths
+
+
+def read_rows(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield rows from a CSV or JSON Lines file, one at a time."""
+    with path.open(encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(f)
+            return
+
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def merge_row(base: AttrDict, row: Dict[str, Any]) -> AttrDict:
+    """Overlay a data row on a resolved document config.
+
+    Dotted keys (e.g., `to.name`) and nested objects (e.g., `{"to": {...}}`)
+    set nested values. Only the dicts along those keys are copied; `base` is
+    shared and never modified. String values are interpolated against the
+    merged config.
+    """
+    result = AttrDict(base)
+    leaves: List[Tuple[AttrDict, str]] = []
+
+    def overlay(item: AttrDict, key: str, val: Any) -> None:
+        if isinstance(val, dict) and isinstance(item.get(key), dict):
+            child = AttrDict(item[key])
+            item[key] = child
+            for name, value in val.items():
+                overlay(child, name, value)
+            return
+
+        item[key] = val
+        leaves.append((item, key))
+
+    for key, val in row.items():
+        *parents, last = key.split(".")
+        item = result
+        for name in parents:
+            child = AttrDict(item.get(name) or {})
+            item[name] = child
+            item = child
+        overlay(item, last, val)
+
+    for item, last in leaves:  # after merging so rows can refer to themselves
+        item[last] = convert_nested_str(item[last], result)
+    return result
+
+
+def merge() -> int:
+    """Render the `--doc` document once per data row; return the row count."""
+    base = get_doc(int(args.doc))
+    tmpl = renderer.get_template(base.template)
+    stem = slugify(base.title or f"document-{int(args.doc) + 1}")
+    if not args.stdout:
+        args.out.mkdir(parents=True, exist_ok=True)
+
+    count = 0
+    for count, row in enumerate(read_rows(args.data), 1):
+        doc = merge_row(base, row)
+        chunks = tmpl.generate(config=doc, xref=make_refs(tmpl, doc), Refs=Refs)
+        if args.stdout:
+            sys.stdout.writelines(chunks)
+            continue
+
+        path = args.out / (row.get("output") or f"{stem}-{count}.html")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            f.writelines(chunks)
+        print(f"[inkfill] wrote {path}")
+    report_profile(f"{count} merged documents")
+    return count
+
+
+def get_doc(idx: int) -> AttrDict:
+    """Return the interpolated config for the nth document (memoized)."""
+    with lock:
+        if idx not in docs:
+            entry = config.document[idx]
+            docs[idx] = doc_config(config, idx)
+            graph.add(idx, ("document", idx), *find_imports(entry))
+            graph.add(
+                idx,
+                *(
+                    ("key", key)
+                    for key in config
+                    if key not in RUNTIME_KEYS  # not loaded from a file
+                    and not overrides(entry, key)
+                ),
+            )
+        return docs[idx]
+
+
+def overrides(entry: AttrDict, key: str) -> bool:
+    """Return `True` if a document entry replaces the top-level `key`."""
+    return key in entry and not isinstance(entry[key], dict)
 
 
 def doc_config(config: AttrDict, idx: int) -> AttrDict:
     """Return an interpolated document-specific config."""
     # 1: start with config
-    result = AttrDict() << config
+    with timing.phase("merge"):
+        result = AttrDict() << config
 
     # 2: resolve any imports
     doc = config.document[idx]
     if "imports" in doc:
         parent = args.config.parent
-        imports = [Path(parent / p).resolve() for p in doc.pop("imports")]
+        imports = [Path(parent / p).resolve() for p in doc.imports]
         for file in imports:
-            result <<= load_config(file, load_imports=True, done=imports)
+            with timing.phase("imports"):
+                imported = load_config(file, load_imports=True, done=imports)
+            with timing.phase("merge"):
+                result <<= imported
 
     # 3: add doc-specific values
-    result <<= doc
-    result.date = result.date or config.now.date()
-    result.pop("document")
-    return convert_nested_str(result, result)
+    with timing.phase("merge"):
+        result <<= doc
+        result.pop("imports", None)
+        result.date = result.date or config.now.date()
+        result.pop("document")
+        result = deepcopy(result)  # don't interpolate lists shared with `config`
+    with timing.phase("convert"):
+        return convert_nested_str(result, result)
 
 
 def convert_nested_str(item: T, config: AttrDict) -> T:
     """Render deeply-nested strings."""
     if isinstance(item, str):
-        item = renderer.from_string(item).render(**config)
+        if is_template(item):
+            item = compile_str(item).render(**config)
     if isinstance(item, dict):
         for key, val in item.items():
             item[key] = convert_nested_str(val, config)
@@ -134,6 +771,29 @@ def convert_nested_str(item: T, config: AttrDict) -> T:
     return item
 
 
+def is_template(text: str) -> bool:
+    """Return `True` if rendering `text` could change it."""
+    return (
+        renderer.variable_start_string in text
+        or renderer.block_start_string in text
+        or renderer.comment_start_string in text
+        or "\r" in text  # jinja normalizes newlines
+        or text.endswith("\n")  # jinja strips a trailing newline
+    )
+
+
+@lru_cache(maxsize=4096)
+def compile_str(source: str) -> Template:
+    """Return a compiled template for `source` (cached)."""
+    return renderer.from_string(source)
+
+
+@pass_environment
+def column_filter(env: Environment, values: Any, name: str, *args: Any) -> List[str]:
+    """Format a column of values with the filter called `name`."""
+    return format_column(values, env.filters[name], *args)
+
+
 def setup_jinja() -> Environment:
     """Set up the jinja environment."""
     global renderer
@@ -146,7 +806,19 @@ def setup_jinja() -> Environment:
         PATH_VIEWS,  # base templates
     ]
 
-    renderer = Environment(loader=FileSystemLoader(paths), undefined=StrictUndefined)
+    cache_path = Path(
+        (args and args.cache_dir) or ENV.get("INKFILL_CACHE", "~/.cache/inkfill")
+    ).expanduser()
+    cache_path.mkdir(parents=True, exist_ok=True)
+
+    profile = args and (args.debug or args.profile)
+    renderer = (ProfilingEnvironment if profile else Environment)(
+        loader=FileSystemLoader(paths),
+        undefined=StrictUndefined,
+        bytecode_cache=FileSystemBytecodeCache(str(cache_path)),
+    )
+    compile_str.cache_clear()
+    referenced_templates.cache_clear()  # parsed with the old environment
 
     renderer.filters["compound"] = compound
     renderer.filters["plural"] = plural
@@ -164,23 +836,87 @@ def setup_jinja() -> Environment:
     renderer.filters["one_or_many"] = one_or_many
     renderer.filters["spell_number"] = spell_number
 
+    renderer.filters["format_column"] = column_filter
+
     renderer.filters["json.dumps"] = lambda o: json.dumps(o, indent=2, default=str)
+
+    renderer.globals["server_css"] = has_compiler()
+    if isinstance(renderer, ProfilingEnvironment):
+        renderer.profile_filters()
     return renderer
 
 
-def setup_config(mtime: int = 0) -> AttrDict:
+def read_config(mtime: int = 0, now: Optional[datetime] = None) -> AttrDict:
+    """Return the config loaded from `args.config`."""
+    result = convert_nested_dict(load_config(args.config))
+    result.mtime = mtime or args.config.stat().st_mtime
+    result.args = args
+    result.now = now or datetime.now()
+    result.document = [AttrDict(d) for d in result.document or []]
+    return result
+
+
+def compile_templates() -> List[str]:
+    """Compile every template on the search path into the bytecode cache."""
+    names = []
+    for name in renderer.list_templates(extensions=TEMPLATE_EXTENSIONS):
+        try:
+            renderer.get_template(name)
+            names.append(name)
+        except TemplateSyntaxError as e:
+            print(f"[inkfill] cannot compile {name}: {e}")
+    print(f"[inkfill] compiled {len(names)} templates")
+    return names
+
+
+def setup_config(mtime: int = 0, now: Optional[datetime] = None) -> AttrDict:
     """Setup the config."""
     global config
 
-    config = convert_nested_dict(load_config(args.config))
-    config.mtime = mtime or args.config.stat().st_mtime
-    config.args = args
-    config.now = datetime.now()
-    config.document = [AttrDict(d) for d in config.document or []]
+    config = read_config(mtime, now)
+    docs.clear()
+    rendered.clear()
+    graph.clear()
     print("[inkfill] configuration loaded")
     return config
 
 
+def reload_config(paths: Set[Path]) -> Set[int]:
+    """Reload the config and invalidate the documents affected by `paths`."""
+    global config
+
+    new = read_config(now=config.now)  # same "now" => same docs
+    with lock:
+        old, config = config, new
+        stale = graph.invalidate({*paths, *config_changes(old, new)})
+        for idx in stale:
+            docs.pop(idx, None)
+    print(f"[inkfill] configuration reloaded; documents changed: {sorted(stale)}")
+    return stale
+
+
+def config_changes(old: AttrDict, new: AttrDict) -> Set[Hashable]:
+    """Return the top-level keys and documents that differ between configs."""
+    result: Set[Hashable] = {
+        ("key", key)
+        for key in {*old, *new}
+        if key not in RUNTIME_KEYS and old.get(key) != new.get(key)
+    }
+    for key in new:
+        if key not in old and key not in RUNTIME_KEYS:  # no document uses it yet
+            result.update(
+                ("document", idx)
+                for idx, entry in enumerate(new.document)
+                if not overrides(entry, key)
+            )
+
+    size = max(len(old.document), len(new.document))
+    for idx in range(size):
+        if old.document[idx : idx + 1] != new.document[idx : idx + 1]:
+            result.add(("document", idx))
+    return result
+
+
 def convert_nested_dict(obj: Union[Dict[str, Any], List[Any], Any]) -> AttrDict:
     """Return deeply-nested `dict` converted to `AttrDict`."""
     if isinstance(obj, dict):
@@ -190,15 +926,33 @@ def convert_nested_dict(obj: Union[Dict[str, Any], List[Any], Any]) -> AttrDict:
     return obj
 
 
-@tl.job(timedelta(seconds=1.5))
-def check_config() -> None:  # pragma: no cover
-    """Periodically reload config, if needed."""
-    mtime = args.config.stat().st_mtime
-    if config and config.mtime == mtime:  # no change
-        return
-    elif config:  # changed
-        print("[inkfill] reloading configuration")
-        setup_config(mtime)
+def config_files() -> List[Path]:
+    """Return the config file and every file it or its documents import."""
+    files = [args.config]
+    files.extend(find_imports(AttrDict(load_config(args.config, load_imports=False))))
+    for doc in config.document:
+        files.extend(find_imports(doc))
+    return files
+
+
+def setup_watcher() -> Watcher:
+    """Watch the config files.
+
+    Template directories are not watched: the search path can include the
+    working directory, and template edits already change `doc_key`.
+    """
+    global watcher
+    watcher = watcher or Watcher(check_config)
+    return watcher.watch(config_files())
+
+
+def check_config(paths: Set[Path]) -> None:
+    """Reload the config if it or any of its imports changed."""
+    if not paths & watcher.files:
+        return  # templates are checked when documents are rendered
+
+    reload_config(paths)
+    setup_watcher()  # imports may have changed
 
 
 def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover
@@ -206,12 +960,45 @@ def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover
     global args
     args = parse_docopt(__doc__, argv=argv, version=__version__, read_config=False)
     args.config = Path(cast(str, args.config)).resolve()
+    args.out = Path(cast(str, args.out)).resolve()
+    if args.refs:
+        args.refs = Path(cast(str, args.refs)).resolve()
+    if args.data:
+        args.data = Path(cast(str, args.data)).resolve()
+    rendered.max_size = int(args.cache_size) * 2**20
 
     setup_config()
     setup_jinja()
 
-    tl.start()
-    app.run(reloader=True)
+    if args.build:
+        try:
+            check_outputs(range(len(config.document)))
+        except ValueError as e:
+            sys.exit(f"[inkfill] {e}")
+        build()
+        return
+
+    if args.compile:
+        compile_templates()
+        return
+
+    if args.merge:
+        merge()
+        return
+
+    setup_watcher().start()
+    compile_less(PATH_VIEWS / "static" / "inkfill.less")  # compile once at startup
+    options = {}
+    if args.server in WORKER_OPTIONS:
+        options[WORKER_OPTIONS[args.server]] = int(args.workers)
+
+    app.run(
+        server=args.server,
+        host=args.host,
+        port=int(args.port),
+        reloader=bool(args.debug),
+        **options,
+    )
 
 
 if __name__ == "__main__":  # pragma: no cover
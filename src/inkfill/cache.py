@@ -0,0 +1,127 @@
+"""Bounded caches."""
+
+# std
+from __future__ import annotations
+from collections import OrderedDict
+from threading import Lock
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Generic
+from typing import Hashable
+from typing import Optional
+from typing import TypeVar
+
+K = TypeVar("K", bound=Hashable)
+"""Cache key type."""
+
+V = TypeVar("V")
+"""Cache value type."""
+
+
+class LRUCache(Generic[K, V]):
+    """Least-recently-used cache bounded by the total size of its values.
+
+    >>> cache: LRUCache[str, str] = LRUCache(6)
+    >>> cache.put("a", "aaa")
+    'aaa'
+    >>> cache.put("b", "bbb")
+    'bbb'
+    >>> cache.get("a")
+    'aaa'
+    >>> cache.put("c", "ccc")  # evicts "b"
+    'ccc'
+    >>> cache.get("b") is None
+    True
+    >>> cache.stats()
+    {'hits': 1, 'misses': 1, 'items': 2, 'size': 6, 'max_size': 6}
+    """
+
+    max_size: int
+    """Maximum total size of the cached values."""
+
+    size: int
+    """Current total size of the cached values."""
+
+    sizeof: Callable[[Any], int]
+    """Return the size of a value."""
+
+    hits: int
+    """Number of successful lookups."""
+
+    misses: int
+    """Number of failed lookups."""
+
+    def __init__(self, max_size: int, sizeof: Callable[[Any], int] = len) -> None:
+        """Construct an empty cache."""
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self._items: OrderedDict[K, V] = OrderedDict()
+        self._sizes: Dict[K, int] = {}
+        self._lock = Lock()
+        self.size = self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached items."""
+        return len(self._items)
+
+    def __contains__(self, key: K) -> bool:
+        """Return `True` if `key` is cached (does not count as a lookup)."""
+        return key in self._items
+
+    def clear(self) -> LRUCache[K, V]:
+        """Remove all items."""
+        with self._lock:
+            self._items.clear()
+            self._sizes.clear()
+            self.size = 0
+        return self
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Return the cached value for `key` or `default`."""
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key: K, value: V) -> V:
+        """Cache `value` under `key`, evicting old items to make room.
+
+        Values larger than `max_size` are returned without being cached.
+        """
+        size = self.sizeof(value)
+        with self._lock:
+            self._remove(key)
+            if size > self.max_size:
+                return value
+
+            self._items[key] = value
+            self._sizes[key] = size
+            self.size += size
+            while self.size > self.max_size:
+                self._remove(next(iter(self._items)))
+        return value
+
+    def pop(self, key: K) -> Optional[V]:
+        """Remove and return the value for `key`, if any."""
+        with self._lock:
+            return self._remove(key)
+
+    def _remove(self, key: K) -> Optional[V]:
+        if key not in self._items:
+            return None
+        self.size -= self._sizes.pop(key)
+        return self._items.pop(key)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the cache counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "items": len(self._items),
+            "size": self.size,
+            "max_size": self.max_size,
+        }
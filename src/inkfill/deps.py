@@ -0,0 +1,78 @@
+"""Document dependency tracking."""
+
+# std
+from __future__ import annotations
+from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import Set
+
+
+class DepGraph:
+    """Map documents to the inputs (files, config keys) they depend on.
+
+    >>> graph = DepGraph().add(0, "a.toml", "base.j2").add(1, "base.j2")
+    >>> graph.affected(["a.toml"])
+    {0}
+    >>> graph.invalidate(["base.j2"])
+    {0, 1}
+    >>> graph.version(0), graph.affected(["a.toml"])
+    (1, set())
+    """
+
+    inputs: Dict[int, Set[Hashable]]
+    """Documents mapped to their inputs."""
+
+    users: Dict[Hashable, Set[int]]
+    """Inputs mapped to the documents that use them."""
+
+    versions: Dict[int, int]
+    """Number of times each document has been invalidated."""
+
+    def __init__(self) -> None:
+        """Construct an empty graph."""
+        self.inputs = {}
+        self.users = {}
+        self.versions = {}
+
+    def clear(self) -> DepGraph:
+        """Remove all documents and inputs."""
+        self.inputs.clear()
+        self.users.clear()
+        self.versions.clear()
+        return self
+
+    def add(self, doc: int, *inputs: Hashable) -> DepGraph:
+        """Record that `doc` depends on `inputs`."""
+        self.inputs.setdefault(doc, set()).update(inputs)
+        for item in inputs:
+            self.users.setdefault(item, set()).add(doc)
+        return self
+
+    def remove(self, doc: int) -> DepGraph:
+        """Forget the inputs of `doc`."""
+        for item in self.inputs.pop(doc, set()):
+            users = self.users[item]
+            users.discard(doc)
+            if not users:
+                del self.users[item]
+        return self
+
+    def affected(self, changed: Iterable[Hashable]) -> Set[int]:
+        """Return the documents that depend on any of the `changed` inputs."""
+        result: Set[int] = set()
+        for item in changed:
+            result |= self.users.get(item, set())
+        return result
+
+    def invalidate(self, changed: Iterable[Hashable]) -> Set[int]:
+        """Forget and return the documents affected by the `changed` inputs."""
+        result = self.affected(changed)
+        for doc in result:
+            self.remove(doc)
+            self.versions[doc] = self.version(doc) + 1
+        return result
+
+    def version(self, doc: int) -> int:
+        """Return the number of times `doc` has been invalidated."""
+        return self.versions.get(doc, 0)
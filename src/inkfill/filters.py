@@ -3,8 +3,15 @@
 # std
 from datetime import datetime
 from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Literal
+from typing import Optional
+from typing import Tuple
 
 # pkg
 from .numerals import commafy
@@ -54,6 +61,12 @@ def compound(
     return f"{first}{',' if oxford else ''} {conjunction} {last}"
 
 
+PluralRule = Tuple[str, int, str]
+"""Suffix, number of characters to remove, and characters to add."""
+
+SuffixTrie = Dict[Optional[str], Any]
+"""Reversed suffix characters mapped to child nodes; `None` maps to a rule."""
+
 SPECIAL_PLURALS = {
     # ends in -(e)n
     "ox": "oxen",
@@ -111,96 +124,110 @@ SPECIAL_PLURALS = {
 }
 
 
-def plural(word: str) -> str:
-    """Return best attempt at forming an [English plural](https://en.wikipedia.org/wiki/English_plurals)."""
-    if word in SPECIAL_PLURALS:
-        return SPECIAL_PLURALS[word]
-
-    if len(word) == 1:
-        return f"{word}'s"
-    if len(word) == 2 and word.endswith("."):
-        return f"{word[0]}{word}"
+CONSONANTS = "bcdfghjklmnpqrstvwxz"  # spell-checker: disable-line
+"""Lowercase English consonants."""
 
+PLURAL_RULES: List[PluralRule] = [
     # ends in any sibilant
-    for sibilant in [
-        "ss",
-        "se",
-        "sh",
-        "uch",
-        "ge",
-        "tch",
-        "nch",
-        "rch",
-        "rich",
-        "each",
-        "oach",  # spell-checker: disable-line
-        "wich",  # spell-checker: disable-line
-        "ge",
-        "tz",
-    ]:
-        if word.endswith(sibilant):
-            return f"{word}{'s' if word.endswith('e') else 'es'}"
-
+    *(
+        (sibilant, 0, "s" if sibilant.endswith("e") else "es")
+        for sibilant in [
+            "ss",
+            "se",
+            "sh",
+            "uch",
+            "ge",
+            "tch",
+            "nch",
+            "rch",
+            "rich",
+            "each",
+            "oach",  # spell-checker: disable-line
+            "wich",  # spell-checker: disable-line
+            "tz",
+        ]
+    ),
     # ends in voiceless constants
-    for voiceless in ["p", "t", "ck", "ff", "gh", "ph", "th", "ech", "ich", "och"]:
-        if word.endswith(voiceless):
-            return f"{word}s"
-
-    # vowels = "aeiou"  # spell-checker: disable-line
-    consonants = "bcdfghjklmnpqrstvwxz"  # spell-checker: disable-line
-
+    *(
+        (voiceless, 0, "s")
+        for voiceless in ["p", "t", "ck", "ff", "gh", "ph", "th", "ech", "ich", "och"]
+    ),
     # NOTE: skipping consonant + o ending
-    # if word[-1] == "o" and word[-2] in consonants:
-    #     return f"{word}es"
-
     # ends in -y
-    if word.endswith("y"):
-        if word[-2] in consonants or word.endswith("quy"):
-            return f"{word[:-1]}ies"
-        return f"{word}s"
-
+    *((f"{consonant}y", 1, "ies") for consonant in CONSONANTS),
+    ("quy", 1, "ies"),
+    ("y", 0, "s"),
     # NOTE: skipping the -f transformation
-    # if word.endswith("f"):
-    #     return f"{word[:-1]}ves"
-
     # Latin (some skipped)
-    # -a => -e
-    # if word.endswith("a"):
-    #     return f"{word}e"
-    # We can do the inverse: if it's plural, leave it.
-    if word.endswith("ae"):
-        return word
-
+    # -a => -e: we can do the inverse: if it's plural, leave it.
+    ("ae", 0, ""),
     # -ex, -ix => -ices
-    if word.endswith("ex") or word.endswith("ix"):
-        return f"{word[:-2]}ices"
+    ("ex", 2, "ices"),
+    ("ix", 2, "ices"),
     # -is => -es (-polis => -poleis)  # spell-checker: disable-line
-    if word.endswith("is"):
-        if word.endswith("polis"):  # from Greek
-            return f"{word[:-2]}eis"
-        return f"{word[:-2]}es"
+    ("polis", 2, "eis"),  # from Greek
+    ("is", 2, "es"),
     # -ies => -ies
-    if word.endswith("ies"):
-        return word
+    ("ies", 0, ""),
     # -um => -a
-    if word.endswith("um"):
-        return f"{word[:-2]}a"
+    ("um", 2, "a"),
     # -us => -i
-    if word.endswith("us"):
-        return f"{word[:-2]}i"
-
+    ("us", 2, "i"),
     # Greek (some skipped)
     # -on => -a
-    if word.endswith("on"):
-        return f"{word[:-2]}a"
-    # -as => -antes
-    # if word.endswith("as"):
-    #     return f"{word[:-2]}antes"
-    # -ma => -mata  # spell-checker: disable-line
-    # if word.endswith("ma"):
-    #     return f"{word[:-2]}mata" # spell-checker: disable-line
+    ("on", 2, "a"),
+    # -as => -antes, -ma => -mata: skipped
+]
+"""Suffixes, how many characters to remove, and what to add (earlier rules win)."""
+
+
+def suffix_trie(rules: List[PluralRule]) -> SuffixTrie:
+    """Compile rules into a trie of reversed suffixes.
+
+    Each rule is stored as `(priority, strip, add)` under the `None` key.
+
+    >>> suffix_trie([("ss", 0, "es")])
+    {'s': {'s': {None: (0, 0, 'es')}}}
+    """
+    trie: SuffixTrie = {}
+    for priority, (suffix, strip, add) in enumerate(rules):
+        node = trie
+        for char in reversed(suffix):
+            node = node.setdefault(char, {})
+        node.setdefault(None, (priority, strip, add))
+    return trie
 
-    return f"{word}s"
+
+PLURAL_TRIE: SuffixTrie = suffix_trie(PLURAL_RULES)
+"""`PLURAL_RULES` compiled by `suffix_trie` (rebuild it after changing the rules)."""
+
+
+@lru_cache(maxsize=4096)
+def plural(word: str) -> str:
+    """Return best attempt at forming an [English plural](https://en.wikipedia.org/wiki/English_plurals)."""
+    if word in SPECIAL_PLURALS:
+        return SPECIAL_PLURALS[word]
+
+    if len(word) == 1:
+        return f"{word}'s"
+    if len(word) == 2 and word.endswith("."):
+        return f"{word[0]}{word}"
+
+    # walk the suffix once, keeping the earliest matching rule
+    best: Optional[Tuple[int, int, str]] = None
+    node = PLURAL_TRIE
+    for char in reversed(word):
+        if char not in node:
+            break
+        node = node[char]
+        rule = node.get(None)
+        if rule and (best is None or rule < best):
+            best = rule
+
+    if best is None:
+        return f"{word}s"
+    _, strip, add = best
+    return f"{word[: len(word) - strip]}{add}"
 
 
 def one_or_many(num: int, one: str, many: str = "") -> str:
@@ -225,6 +252,11 @@ def USD(num: float, cents: bool = False) -> str:
     return f"US${int(num):,}"
 
 
+def USD_many(nums: Iterable[float], cents: bool = False) -> List[str]:
+    """Return a column of formatted US Dollars."""
+    return format_column(nums, USD, cents)
+
+
 def dollars(num: float, exact: bool = False) -> str:
     """Return spelled-out dollars. Commonly used in contracts."""
     dec = Decimal(str(num))
@@ -250,3 +282,34 @@ def dollars(num: float, exact: bool = False) -> str:
     cents = exact or part > 0 or num < 10
     result += f" ({USD(num, cents=cents)})"
     return result
+
+
+## Columns
+
+
+def format_column(
+    values: Iterable[Any], func: Callable[..., str], *args: Any, **kwargs: Any
+) -> List[str]:
+    """Format a column of values (a sequence or NumPy array).
+
+    Repeated (hashable) values are only formatted once.
+
+    >>> format_column([1000, 5, 1000], commafy)
+    ['1,000', '5', '1,000']
+    """
+    if hasattr(values, "tolist"):  # NumPy scalars are slow to hash
+        values = values.tolist()
+
+    done: Dict[Tuple[type, Any], str] = {}
+    result: List[str] = []
+    for value in values:
+        key = (value.__class__, value)  # 1 and 1.0 format differently
+        try:
+            text = done.get(key)
+        except TypeError:  # unhashable (e.g., list or dict)
+            result.append(func(value, *args, **kwargs))
+            continue
+        if text is None:
+            text = done[key] = func(value, *args, **kwargs)
+        result.append(text)
+    return result
@@ -0,0 +1,40 @@
+"""Compile [LESS](https://lesscss.org/) stylesheets to CSS."""
+
+# std
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+import shutil
+import subprocess
+
+# lib
+try:
+    import lesscpy  # type: ignore
+except ImportError:  # pragma: no cover
+    lesscpy = None
+
+
+def has_compiler() -> bool:
+    """Return `True` if a LESS compiler (`lesscpy` or `lessc`) is available."""
+    return bool(lesscpy or shutil.which("lessc"))
+
+
+def compile_less(path: Path) -> Optional[str]:
+    """Return CSS compiled from a LESS file or `None` if there is no compiler.
+
+    Results are cached until the file's modification time changes.
+    """
+    if not has_compiler():  # pragma: no cover
+        return None
+    return _compile(path.resolve(), path.stat().st_mtime)
+
+
+@lru_cache(maxsize=64)
+def _compile(path: Path, mtime: float) -> str:
+    if lesscpy:
+        return str(lesscpy.compile(str(path)))
+
+    lessc = str(shutil.which("lessc"))  # pragma: no cover
+    return subprocess.run(  # pragma: no cover
+        [lessc, str(path)], capture_output=True, check=True, text=True
+    ).stdout
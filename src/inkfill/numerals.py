@@ -3,8 +3,16 @@
 # std
 from __future__ import annotations
 from dataclasses import dataclass
+from dataclasses import field
+from itertools import chain
+from itertools import count
+from itertools import islice
+from itertools import product
 from typing import Callable
 from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
 
 # pkg
 from .registry import Registrable
@@ -21,24 +29,41 @@ def to_decimal(num: int) -> str:
     return str(num)
 
 
+TABLE_SIZE = 5000
+"""Numerals below this are looked up in precomputed tables."""
+
 ## Alphabetic numerals
 
 ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 """English alphabet."""
 
 
+def _alpha(num: int) -> str:
+    digits: List[str] = []
+    while num > 0:
+        num, remainder = divmod(num - 1, 26)
+        digits.append(ALPHABET[remainder])
+    return "".join(reversed(digits))
+
+
+ALPHA_TABLE: List[str] = [""] + [
+    "".join(letters)
+    for letters in islice(
+        chain.from_iterable(product(ALPHABET, repeat=size) for size in count(1)),
+        TABLE_SIZE - 1,
+    )
+]
+"""Alphabetical numerals for `0` to `TABLE_SIZE - 1`."""
+
+
 def to_alpha(num: int) -> str:
     """English alphabetical numerals."""
     # https://en.wikipedia.org/wiki/English_alphabet
-    result = ""
     if num < 1:
-        return result
-
-    while num > 0:
-        num, remainder = divmod(num - 1, 26)
-        result = ALPHABET[remainder] + result
-
-    return result
+        return ""
+    if num < TABLE_SIZE:
+        return ALPHA_TABLE[num]
+    return _alpha(num)
 
 
 ROMAN_VALS = [1000, 900, 500, 400, 100, 90, 50, 40, 10, 9, 5, 4, 1]
@@ -48,19 +73,43 @@ ROMAN_SYMS = ["M", "CM", "D", "CD", "C", "XC", "L", "XL", "X", "IX", "V", "IV",
 """Roman numeral symbols."""
 
 
+ROMAN_DIGITS: List[List[str]] = [
+    ["", "I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX"],
+    ["", "X", "XX", "XXX", "XL", "L", "LX", "LXX", "LXXX", "XC"],
+    ["", "C", "CC", "CCC", "CD", "D", "DC", "DCC", "DCCC", "CM"],
+]
+"""Roman numerals for each digit of the ones, tens, and hundreds."""
+
+
+def _roman(num: int) -> str:
+    thousands, num = divmod(num, 1000)
+    hundreds, num = divmod(num, 100)
+    tens, ones = divmod(num, 10)
+    return (
+        "M" * thousands
+        + ROMAN_DIGITS[2][hundreds]
+        + ROMAN_DIGITS[1][tens]
+        + ROMAN_DIGITS[0][ones]
+    )
+
+
+ROMAN_TABLE: List[str] = [
+    "M" * thousands + hundreds + tens + ones
+    for thousands in range(-(-TABLE_SIZE // 1000))
+    for hundreds in ROMAN_DIGITS[2]
+    for tens in ROMAN_DIGITS[1]
+    for ones in ROMAN_DIGITS[0]
+][:TABLE_SIZE]
+"""Roman numerals for `0` to `TABLE_SIZE - 1`."""
+
+
 def to_roman(num: int) -> str:
     """Return the [Roman numeral](https://en.wikipedia.org/wiki/Roman_numerals)."""
-    result = ""
     if num < 1:
-        return result
-
-    idx = 0
-    while num > 0:
-        for _ in range(num // ROMAN_VALS[idx]):
-            result += ROMAN_SYMS[idx]
-            num -= ROMAN_VALS[idx]
-        idx += 1
-    return result
+        return ""
+    if num < TABLE_SIZE:
+        return ROMAN_TABLE[num]
+    return _roman(num)
 
 
 ## [English numerals](https://en.wikipedia.org/wiki/English_numerals)
@@ -133,38 +182,70 @@ def _space_join(*args: str) -> str:
     return " ".join(arg for arg in args if arg)
 
 
-def _divide(dividend: int, divisor: int, magnitude: str) -> str:
-    return _space_join(_pos(dividend // divisor), magnitude, _pos(dividend % divisor))
+def _group(num: int) -> str:
+    hundreds, rest = divmod(num, 100)
+    if rest < 20:
+        tail = NAME_ONES[rest]
+    else:
+        tens, ones = divmod(rest, 10)
+        tail = NAME_TENS[tens]
+        if ones:  # hyphenate numbers 21-99
+            tail = f"{tail}-{NAME_ONES[ones]}"
+    head = f"{NAME_ONES[hundreds]} hundred" if hundreds else ""
+    return _space_join(head, tail)
 
 
-def _pos(num: int) -> str:
-    if num < 20:
-        return NAME_ONES[num]
-    if num < 100:
-        tens = NAME_TENS[num // 10]
-        ones = NAME_ONES[num % 10]
-        if tens and ones:  # hyphenate numbers 21-99
-            return f"{tens}-{ones}"
-        return _space_join(tens, ones)
-    if num < 1000:
-        return _divide(num, 100, "hundred")
+GROUP_NAMES: List[str] = [_group(n) for n in range(1000)]
+"""Names of `0` (empty) to `999`."""
 
-    illions_number, illions_name = 1, "thousand"
-    for illions_number, illions_name in NAME_ILLIONS.items():
-        if num < 1000 ** (illions_number + 1):
-            break
-    return _divide(num, 1000**illions_number, illions_name)
+
+def _suffix(word: str) -> str:
+    for check, suffix in ORDINAL_SUFFIXES.items():
+        if word.endswith(check):
+            return word[: -len(check)] + suffix
+    return word + "th"
+
+
+def _words(num: int) -> List[str]:
+    """Return the names of the groups and scales of a positive number."""
+    if num < 1000:
+        return [GROUP_NAMES[num]]
+
+    # Past the largest scale, its name repeats: 10**36 is "one thousand decillion".
+    largest = max(NAME_ILLIONS)
+    chunk_size = 1000**largest
+    chunks: List[int] = []
+    while num:
+        num, chunk = divmod(num, chunk_size)
+        chunks.append(chunk)
+
+    words: List[str] = []
+    for idx in range(len(chunks) - 1, -1, -1):
+        groups: List[int] = []
+        chunk = chunks[idx]
+        while chunk:
+            chunk, group = divmod(chunk, 1000)
+            groups.append(group)
+        for scale in range(len(groups) - 1, -1, -1):
+            if groups[scale]:
+                words.append(GROUP_NAMES[groups[scale]])
+                if scale:
+                    words.append(NAME_ILLIONS[scale])
+        if idx:
+            words.append(NAME_ILLIONS[largest])
+    return words
 
 
 def to_cardinal(num: int) -> str:
     """English cardinal numerals."""
     # https://en.wikipedia.org/wiki/Cardinal_numeral
-    # See: https://stackoverflow.com/a/54018199
     if num == 0:
         return "zero"
     if num < 0:
-        return _space_join("negative", _pos(-num))
-    return _pos(num)
+        return " ".join(["negative", *_words(-num)])
+    if num < 1000:
+        return GROUP_NAMES[num]
+    return " ".join(_words(num))
 
 
 def to_nth(num: int) -> str:
@@ -178,19 +259,32 @@ def to_nth(num: int) -> str:
     return str(num) + suffix
 
 
+ORDINAL_NAMES: Dict[str, str] = {
+    name: _suffix(name) for name in GROUP_NAMES[1:] + list(NAME_ILLIONS.values())
+}
+"""Group and scale names mapped to their ordinals."""
+
+
 def to_ordinal(num: int) -> str:
     """English ordinal numerals ("first", "second")."""
     # https://en.wikipedia.org/wiki/Ordinal_numeral
-    cardinal = to_cardinal(num)
-    for check, suffix in ORDINAL_SUFFIXES.items():
-        if cardinal.endswith(check):
-            return cardinal[: -len(check)] + suffix
-    return cardinal + "th"
+    if num == 0:
+        return "zeroth"
+
+    words = _words(abs(num))
+    last = words[-1]
+    words[-1] = ORDINAL_NAMES.get(last) or _suffix(last)
+    if num < 0:
+        words.insert(0, "negative")
+    return " ".join(words)
 
 
 NUMERAL_FUNC = Callable[[int], str]
 """Render a numeral from an integer."""
 
+CACHE_SIZE = 4096
+"""Maximum number of rendered numerals to keep per format."""
+
 
 @dataclass(frozen=True)
 class NumFormat(Registrable):
@@ -208,10 +302,33 @@ class NumFormat(Registrable):
     suffix: str = ""
     """Suffix string when rendering."""
 
+    cache: Dict[Tuple[type, int, bool], str] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    """Rendered numerals (up to `CACHE_SIZE`)."""
+
     def render(self, num: int, punctuation: bool = False) -> str:
-        """Render the numeral."""
+        """Render the numeral (memoized)."""
+        key = (num.__class__, num, punctuation)  # 1, 1.0, and True differ
+        if key in self.cache:
+            return self.cache[key]
+
         val = self.numeral(num)
-        return val if not punctuation else f"{self.prefix}{val}{self.suffix}"
+        val = val if not punctuation else f"{self.prefix}{val}{self.suffix}"
+        if len(self.cache) < CACHE_SIZE:
+            self.cache[key] = val
+        return val
+
+    def render_many(self, nums: Iterable[int], punctuation: bool = False) -> List[str]:
+        """Render a column of numerals (a sequence or NumPy array).
+
+        >>> NumFormat.get("upper-roman").render_many([1, 2, 1])
+        ['I', 'II', 'I']
+        """
+        if hasattr(nums, "tolist"):  # NumPy scalars are slow to hash
+            nums = nums.tolist()
+        render = self.render
+        return [render(num, punctuation) for num in nums]
 
     __call__ = render
 
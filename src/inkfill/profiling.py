@@ -0,0 +1,194 @@
+"""Attribute render time to templates, blocks, macros, calls, and filters."""
+
+# std
+from __future__ import annotations
+from functools import wraps
+from threading import local
+from time import perf_counter
+from types import ModuleType
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import MutableMapping
+from typing import Optional
+from typing import Tuple
+
+# lib
+from jinja2 import Environment
+from jinja2 import Template
+from jinja2.runtime import Context
+from jinja2.runtime import Macro
+
+Key = Tuple[str, str]
+"""Kind (e.g., `"filter"`) and name of a profiled item."""
+
+
+class Profiler:
+    """Count calls and accumulate wall time.
+
+    Times are inclusive: a macro's time includes the filters it calls.
+    Stats are kept per thread so concurrent renders don't mix or reset
+    each other's counts.
+
+    >>> profiler = Profiler()
+    >>> double = profiler.wrap(("filter", "double"), lambda x: x * 2)
+    >>> double(2), double(3)
+    (4, 6)
+    >>> profiler.stats[("filter", "double")][0]
+    2
+    """
+
+    def __init__(self) -> None:
+        """Construct an empty profiler."""
+        self._local = local()
+
+    @property
+    def stats(self) -> Dict[Key, List[Any]]:
+        """Items mapped to `[calls, seconds]` (in the current thread)."""
+        stats: Optional[Dict[Key, List[Any]]] = getattr(self._local, "stats", None)
+        if stats is None:
+            stats = self._local.stats = {}
+        return stats
+
+    def add(self, key: Key, seconds: float, calls: int = 1) -> None:
+        """Record time spent in an item."""
+        stat = self.stats.setdefault(key, [0, 0.0])
+        stat[0] += calls
+        stat[1] += seconds
+
+    def wrap(self, key: Key, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Return `func` wrapped to record its calls."""
+
+        @wraps(func)  # keeps jinja's `pass_context` markers
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(key, perf_counter() - start)
+
+        return timed
+
+    def wrap_iter(self, key: Key, items: Iterator[str]) -> Iterator[str]:
+        """Yield from `items`, recording the time spent producing them."""
+        seconds = 0.0
+        try:
+            while True:
+                start = perf_counter()
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += perf_counter() - start
+                yield item
+        finally:
+            self.add(key, seconds)
+
+    def reset(self) -> Profiler:
+        """Forget the stats recorded in the current thread."""
+        self._local.stats = {}
+        return self
+
+    def report(self, limit: int = 25) -> str:
+        """Return a table of the slowest items."""
+        items = sorted(self.stats.items(), key=lambda i: i[1][1], reverse=True)
+        head = f"{'kind':8} {'name':32} {'calls':>8} {'total ms':>10} {'mean µs':>10}"
+        lines = [head]
+        for (kind, name), (calls, seconds) in items[:limit]:
+            lines.append(
+                f"{kind:8} {name[:32]:32} {calls:8} {seconds * 1000:10.2f}"
+                f" {seconds / calls * 1e6:10.1f}"
+            )
+        return "\n".join(lines)
+
+
+def call_name(obj: Any) -> Key:
+    """Return the key for a callable called from a template."""
+    if isinstance(obj, Macro):
+        return ("macro", obj.name)
+
+    owner = getattr(obj, "__self__", None)
+    if owner is not None and not isinstance(owner, ModuleType):
+        return ("call", f"{type(owner).__name__}.{obj.__name__}")
+    return ("call", getattr(obj, "__qualname__", type(obj).__name__))
+
+
+class ProfilingContext(Context):
+    """Template context that records every call (functions, methods, macros)."""
+
+    environment: ProfilingEnvironment
+
+    def call(__self, __obj: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call `__obj` and record the time it took."""
+        start = perf_counter()
+        try:
+            return super().call(__obj, *args, **kwargs)
+        finally:
+            __self.environment.profiler.add(call_name(__obj), perf_counter() - start)
+
+
+class _Block:
+    """Block render function that records its time."""
+
+    def __init__(self, profiler: Profiler, name: str, func: Callable[..., Any]):
+        self.profiler = profiler
+        self.name = name
+        self.func = func
+
+    def __call__(self, context: Context) -> Iterator[str]:
+        return self.profiler.wrap_iter(("block", self.name), self.func(context))
+
+    def __eq__(self, other: object) -> bool:  # `context.super` looks up by func
+        return other is self or other is self.func
+
+    __hash__ = object.__hash__
+
+
+class ProfilingTemplate(Template):
+    """Template that records the time spent in it and in each of its blocks."""
+
+    @classmethod
+    def _from_namespace(
+        cls,
+        environment: Environment,
+        namespace: MutableMapping[str, Any],
+        globals: MutableMapping[str, Any],
+    ) -> Template:
+        tmpl = super()._from_namespace(environment, namespace, globals)
+        profiler: Profiler = environment.profiler  # type: ignore
+        render = tmpl.root_render_func
+        tmpl_name = tmpl.name or "<string>"
+        key = ("template", tmpl_name)
+        tmpl.root_render_func = lambda ctx: profiler.wrap_iter(key, render(ctx))
+        tmpl.blocks = {
+            name: _Block(profiler, f"{tmpl_name}:{name}", func)
+            for name, func in tmpl.blocks.items()
+        }
+        return tmpl
+
+
+class ProfilingEnvironment(Environment):
+    """Jinja environment that profiles rendering.
+
+    Call `profile_filters` after registering filters.
+    """
+
+    context_class = ProfilingContext
+    template_class = ProfilingTemplate
+
+    profiler: Profiler
+    """Recorded stats."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Construct an environment (same arguments as `Environment`)."""
+        super().__init__(*args, **kwargs)
+        self.profiler = Profiler()
+
+    def profile_filters(self) -> ProfilingEnvironment:
+        """Record calls to every registered filter."""
+        for name, func in self.filters.items():
+            self.filters[name] = self.profiler.wrap(("filter", name), func)
+        return self
@@ -0,0 +1,81 @@
+"""Concurrent WSGI server."""
+
+# std
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from wsgiref.simple_server import make_server
+from wsgiref.simple_server import WSGIRequestHandler
+from wsgiref.simple_server import WSGIServer
+
+# lib
+import bottle  # type: ignore
+
+WORKER_OPTIONS: Dict[str, str] = {
+    "threaded": "workers",
+    "waitress": "threads",
+    "cheroot": "numthreads",
+    "cherrypy": "numthreads",
+    "gunicorn": "workers",
+}
+"""`bottle` server names mapped to the option that sets their worker count."""
+
+
+class PooledWSGIServer(ThreadingMixIn, WSGIServer):
+    """`wsgiref` server that handles requests in a bounded thread pool."""
+
+    daemon_threads = True
+    """Don't wait for requests to finish when shutting down."""
+
+    pool: Optional[ThreadPoolExecutor] = None
+    """Threads that handle requests."""
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        """Handle the request in the thread pool."""
+        assert self.pool, "pool must be set before serving"
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self) -> None:
+        """Stop the server and its threads."""
+        super().server_close()
+        if self.pool:
+            self.pool.shutdown(wait=False)
+
+
+class QuietHandler(WSGIRequestHandler):
+    """Request handler that doesn't log requests."""
+
+    def log_request(self, *args: Any, **kwargs: Any) -> None:
+        """Don't log requests."""
+
+
+class ThreadedServer(bottle.ServerAdapter):  # type: ignore
+    """`bottle` adapter for `PooledWSGIServer`.
+
+    Options:
+        workers (int): number of request threads (default: `8`)
+    """
+
+    server: Optional[PooledWSGIServer] = None
+    """Running server."""
+
+    def run(self, handler: Callable[..., Any]) -> None:
+        """Serve `handler` until interrupted."""
+        self.server = make_server(
+            self.host,
+            self.port,
+            handler,
+            server_class=PooledWSGIServer,
+            handler_class=QuietHandler if self.quiet else WSGIRequestHandler,
+        )
+        self.server.pool = ThreadPoolExecutor(int(self.options.get("workers", 8)))
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+
+
+bottle.server_names["threaded"] = ThreadedServer
@@ -0,0 +1,84 @@
+"""Time the phases of a request."""
+
+# std
+from __future__ import annotations
+from contextlib import contextmanager
+from threading import local
+from time import perf_counter
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+
+_local = local()
+
+
+class Timings:
+    """Durations of named phases in milliseconds.
+
+    >>> timings = Timings()
+    >>> with timings.phase("render"):
+    ...     pass
+    >>> list(timings.phases)
+    ['render']
+    >>> Timings({"config": 1.5, "render": 20}).header()
+    'config;dur=1.50, render;dur=20.00'
+    """
+
+    phases: Dict[str, float]
+    """Phase names mapped to total milliseconds (in order of first use)."""
+
+    started: float
+    """When timing started (from `perf_counter`)."""
+
+    def __init__(self, phases: Optional[Dict[str, float]] = None) -> None:
+        """Construct a set of timings."""
+        self.phases = phases or {}
+        self.started = perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent in this block to the phase `name`."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            ms = (perf_counter() - start) * 1000
+            self.phases[name] = self.phases.get(name, 0) + ms
+
+    def total(self) -> float:
+        """Return milliseconds since timing started."""
+        return (perf_counter() - self.started) * 1000
+
+    def header(self) -> str:
+        """Return the phases as a `Server-Timing` header value."""
+        return ", ".join(f"{name};dur={ms:.2f}" for name, ms in self.phases.items())
+
+    def __str__(self) -> str:
+        """Return the phases for logging."""
+        return " ".join(f"{name}={ms:.2f}ms" for name, ms in self.phases.items())
+
+
+def start() -> Timings:
+    """Start timing phases in this thread."""
+    timings = Timings()
+    _local.timings = timings
+    return timings
+
+
+def stop() -> Optional[Timings]:
+    """Stop timing phases in this thread and return the timings."""
+    timings: Optional[Timings] = getattr(_local, "timings", None)
+    _local.timings = None
+    return timings
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a block if timing has started in this thread."""
+    timings: Optional[Timings] = getattr(_local, "timings", None)
+    if timings is None:
+        yield
+        return
+
+    with timings.phase(name):
+        yield
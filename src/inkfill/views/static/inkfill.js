@@ -5,8 +5,8 @@
   @license MIT
 */
 
-// resolve references
-[].slice.apply(document.querySelectorAll("a.ref")).forEach((link) => {
+// resolve forward references (not needed for two-pass renders)
+[].slice.apply(document.querySelectorAll("a.ref.not-defined")).forEach((link) => {
   const href = link.getAttribute("href");
   const ref = document.querySelector(href);
   if (!ref) {
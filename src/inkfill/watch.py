@@ -0,0 +1,173 @@
+"""Watch files and directories for changes."""
+
+# std
+from __future__ import annotations
+from pathlib import Path
+from threading import Event
+from threading import Lock
+from threading import Thread
+from threading import Timer
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Set
+import os
+
+# lib
+try:
+    from watchdog.events import FileSystemEvent
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover
+    FileSystemEventHandler = object  # type: ignore
+    Observer = None  # type: ignore
+
+OnChange = Callable[[Set[Path]], None]
+"""Called with the paths that changed."""
+
+
+class Watcher(FileSystemEventHandler):
+    """Call a function when watched files change.
+
+    Uses [`watchdog`](https://pypi.org/project/watchdog/) (inotify on Linux)
+    if it is installed; otherwise, polls `stat()` every `interval` seconds.
+    Changes that arrive within `debounce` seconds of each other are reported
+    together in a single call.
+    """
+
+    on_change: OnChange
+    """Function to call with the changed paths."""
+
+    debounce: float
+    """Seconds to wait for more changes before calling `on_change`."""
+
+    interval: float
+    """Seconds between polls (polling mode only)."""
+
+    polling: bool
+    """Whether to poll instead of using `watchdog`."""
+
+    files: Set[Path]
+    """Watched files."""
+
+    def __init__(
+        self,
+        on_change: OnChange,
+        debounce: float = 0.1,
+        interval: float = 0.5,
+        polling: bool = False,
+    ) -> None:
+        """Construct a watcher (call `start` to begin watching)."""
+        self.on_change = on_change
+        self.debounce = debounce
+        self.interval = interval
+        self.polling = polling or Observer is None
+        self.files = set()
+
+        self._lock = Lock()
+        self._changed: Set[Path] = set()
+        self._timer: Optional[Timer] = None
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._observer: Any = None
+        self._mtimes: Dict[Path, float] = {}
+
+    def watch(self, files: Iterable[Path]) -> Watcher:
+        """Replace the watched files."""
+        self.files = {Path(f).resolve() for f in files}
+        if self.polling:
+            self._mtimes = self._snapshot()
+        elif self._observer:
+            self._schedule()
+        return self
+
+    def is_watched(self, path: Path) -> bool:
+        """Return `True` if `path` is a watched file."""
+        return path in self.files
+
+    def start(self) -> Watcher:
+        """Start watching in a background thread."""
+        self._stop.clear()
+        if self.polling:
+            self._mtimes = self._snapshot()
+            self._thread = Thread(target=self._poll, daemon=True)
+            self._thread.start()
+        else:
+            self._observer = Observer()
+            self._observer.daemon = True
+            self._schedule()
+            self._observer.start()
+        return self
+
+    def stop(self) -> Watcher:
+        """Stop watching."""
+        self._stop.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer = None
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+        return self
+
+    def changed(self, path: Path) -> None:
+        """Record a changed path and (re)start the debounce timer."""
+        path = Path(path).resolve()
+        if not self.is_watched(path):
+            return
+
+        with self._lock:
+            self._changed.add(path)
+            if self._timer:
+                self._timer.cancel()
+            self._timer = Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Report the recorded changes, if any."""
+        with self._lock:
+            paths, self._changed = self._changed, set()
+            self._timer = None
+        if paths:
+            self.on_change(paths)
+
+    ## watchdog
+
+    def _schedule(self) -> None:
+        self._observer.unschedule_all()
+        for path in {f.parent for f in self.files}:  # events are per directory
+            if path.is_dir():
+                self._observer.schedule(self, str(path), recursive=False)
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        """Handle a `watchdog` event."""
+        if event.is_directory or event.event_type in ("opened", "closed_no_write"):
+            return
+        self.changed(Path(os.fsdecode(event.src_path)))
+        if getattr(event, "dest_path", None):  # moved
+            self.changed(Path(os.fsdecode(event.dest_path)))
+
+    ## polling
+
+    def _snapshot(self) -> Dict[Path, float]:
+        result: Dict[Path, float] = {}
+        for path in self.files:
+            try:
+                result[path] = path.stat().st_mtime
+            except OSError:
+                pass  # missing files are treated as changed when they appear
+        return result
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.interval):
+            mtimes = self._snapshot()
+            for path in set(mtimes) ^ set(self._mtimes):  # added or removed
+                self.changed(path)
+            for path, mtime in mtimes.items():
+                if path in self._mtimes and self._mtimes[path] != mtime:
+                    self.changed(path)
+            self._mtimes = mtimes
@@ -4,10 +4,14 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from dataclasses import field
+from functools import lru_cache
 from typing import Callable
+from typing import cast
 from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
 from typing import Union
 import re
 
@@ -16,18 +20,24 @@ from .registry import Registrable
 from .numerals import NumFormat
 from .numerals import DECIMAL
 
-RE_NON_SLUG = re.compile(r"[^a-z0-9_-]")
-"""Match characters to convert to dash in a slug."""
+IndexEntry = Dict[str, str]
+"""Exported reference: `kind`, `cite`, `name`, `document`, `href`, and `text`."""
 
-RE_REPEATED_DASH = re.compile(r"-{2,}")
-"""Match repeated dashes."""
+RefIndex = Dict[str, Dict[str, IndexEntry]]
+"""Document names mapped to slugs mapped to exported references."""
+
+RE_NON_SLUG = re.compile(r"[^a-z0-9_]+")
+"""Match runs of characters (including dashes) to convert to one dash."""
 
 
 def slugify(*names: str) -> str:
     """Return a slug version of a name."""
-    return RE_REPEATED_DASH.sub(
-        "-", RE_NON_SLUG.sub("-", "-".join(names).lower())
-    ).strip("-")
+    return _slugify("-".join(names))
+
+
+@lru_cache(maxsize=4096)
+def _slugify(name: str) -> str:
+    return RE_NON_SLUG.sub("-", name.lower()).strip("-")
 
 
 @dataclass(frozen=True)
@@ -45,22 +55,36 @@ class RefFormat(Registrable):
         return self.render(ref)
 
 
-def cite_sections(ref: Ref) -> str:
-    """Cite until top-level-like items."""
-    parent = ref
-    top_like = [Article, Part, Exhibit, Appendix, Annex, Schedule]
-    numerals: List[NumFormat] = []
-    values: List[int] = []
-    while parent.parent and parent.numerals and parent.kind not in top_like:
-        numerals.insert(0, parent.numerals[-1])
-        values.insert(0, parent.values[-1])
-        parent = parent.parent
-
-    return "".join(
-        num(val, idx > 0) for idx, (val, num) in enumerate(zip(values, numerals))
+TOP_LIKE = {"Article", "Part", "Exhibit", "Appendix", "Annex", "Schedule"}
+"""Names of divisions that `cite_sections` stops at."""
+
+
+def _in_sections(ref: Optional[Ref]) -> bool:
+    return bool(
+        ref
+        and ref.parent
+        and ref.level
+        and ref.level.numeral
+        and ref.kind.name not in TOP_LIKE
     )
 
 
+def cite_sections(ref: Ref) -> str:
+    """Cite until top-level-like items (cached on `ref`)."""
+    if ref._sections is None:
+        if not _in_sections(ref):
+            ref._sections = ""
+        else:
+            level = cast(Level, ref.level)
+            numeral = cast(NumFormat, level.numeral)
+            if _in_sections(ref.parent):
+                parent = cast(Ref, ref.parent)
+                ref._sections = cite_sections(parent) + numeral(level.value, True)
+            else:
+                ref._sections = numeral(level.value)
+    return ref._sections
+
+
 def cite_name(ref: Ref, cite: str = "") -> str:
     """Return citation format for most section headings."""
     cite = cite or cite_sections(ref)
@@ -85,9 +109,14 @@ TWO_LINE = RefFormat(
 ).add()
 """Show `kind`, `cite`, and `name` on two lines."""
 
-CITE_LAST = RefFormat(
-    "cite-last", lambda ref: ref.numerals[-1].render(ref.values[-1], True)
-).add()
+
+def cite_last(ref: Ref) -> str:
+    """Return the last part of the citation."""
+    level = cast(Level, ref.level)
+    return cast(NumFormat, level.numeral).render(level.value, True)
+
+
+CITE_LAST = RefFormat("cite-last", cite_last).add()
 """Show end of citation (e.g., define `Paragraph`, `Clause`)."""
 
 CITE_LAST_NAME = RefFormat(
@@ -184,51 +213,208 @@ Schedule = Division("Schedule", NumFormat.get("upper-alpha"), define=TWO_LINE).a
 """Supplementary material."""
 
 
-@dataclass
+class Level:
+    """One level of a citation (e.g., the "(a)" in "1.2(a)").
+
+    Levels are immutable and linked to the level above them, so every
+    reference below a level shares it instead of copying it.
+    """
+
+    __slots__ = ("value", "numeral", "define", "refer", "prev", "numbered", "_cite")
+
+    value: int
+    """Citation numeral value."""
+
+    numeral: Optional[NumFormat]
+    """Citation numeral format."""
+
+    define: Optional[RefFormat]
+    """Definition format."""
+
+    refer: Optional[RefFormat]
+    """Reference format."""
+
+    prev: Optional[Level]
+    """Level above this one."""
+
+    numbered: bool
+    """Whether this level or any level above it has a numeral."""
+
+    def __init__(
+        self,
+        value: int = 0,
+        numeral: Optional[NumFormat] = None,
+        define: Optional[RefFormat] = None,
+        refer: Optional[RefFormat] = None,
+        prev: Optional[Level] = None,
+    ) -> None:
+        """Construct a level."""
+        self.value = value
+        self.numeral = numeral
+        self.define = define
+        self.refer = refer
+        self.prev = prev
+        self.numbered = numeral is not None or (prev is not None and prev.numbered)
+        self._cite: Optional[str] = None
+
+    @staticmethod
+    def chain(
+        values: List[int],
+        numerals: List[NumFormat],
+        defines: List[RefFormat],
+        refers: List[RefFormat],
+    ) -> Optional[Level]:
+        """Return the last of the levels built from parallel lists."""
+        level = None
+        for idx in range(max(len(values), len(numerals), len(defines), len(refers))):
+            level = Level(
+                values[idx] if idx < len(values) else 0,
+                numerals[idx] if idx < len(numerals) else None,
+                defines[idx] if idx < len(defines) else None,
+                refers[idx] if idx < len(refers) else None,
+                level,
+            )
+        return level
+
+    @property
+    def cite(self) -> str:
+        """Citation through this level (cached; built on the level above)."""
+        if self._cite is None:
+            prev = self.prev
+            prefix = prev.cite if prev else ""
+            if self.numeral is None:
+                self._cite = prefix
+            else:
+                punctuation = prev is not None and prev.numbered
+                self._cite = prefix + self.numeral(self.value, punctuation)
+        return self._cite
+
+    def path(self) -> List[Level]:
+        """Return the levels from the top down to this one."""
+        result: List[Level] = []
+        level: Optional[Level] = self
+        while level:
+            result.append(level)
+            level = level.prev
+        result.reverse()
+        return result
+
+    def next(self) -> Level:
+        """Return the following level (same formats, next value)."""
+        return Level(self.value + 1, self.numeral, self.define, self.refer, self.prev)
+
+
 class Ref:
     """Reference to a term or section of a document."""
 
     # `name` and `slug` are for referencing
-    # `kind` and formats are for levels/sectioning.
+    # `kind` and `level` are for levels/sectioning.
+
+    __slots__ = (
+        "name",
+        "slug",
+        "kind",
+        "level",
+        "parent",
+        "is_defined",
+        "resolved",
+        "owner",
+        "external",
+        "_sections",
+    )
 
-    name: str = ""
+    name: str
     """Term or section title."""
 
-    slug: str = ""
+    slug: str
     """Unique ID of this reference (should include `kind` + `name`)."""
 
-    kind: Division = field(default_factory=lambda: Section)
+    kind: Division
     """What kind of reference is this?"""
 
-    values: List[int] = field(default_factory=list)
-    """Citation numeral values."""
+    level: Optional[Level]
+    """Last level of the citation (shared with the parent's levels)."""
 
-    numerals: List[NumFormat] = field(default_factory=list)
-    """Citation numeral formats."""
+    parent: Optional[Ref]
+    """Parent reference."""
 
-    defines: List[RefFormat] = field(default_factory=list)
-    """Definition formats."""
+    is_defined: bool
+    """Whether or not this reference has been defined."""
 
-    refers: List[RefFormat] = field(default_factory=list)
-    """Reference formats."""
+    resolved: Optional[Ref]
+    """Definition of this reference from a previous rendering pass."""
 
-    parent: Optional[Ref] = None
-    """Parent reference."""
+    owner: Optional[Refs]
+    """Reference manager that stores (and indexes) this reference."""
 
-    is_defined: bool = False
-    """Whether or not this reference has been defined."""
+    external: Optional[IndexEntry]
+    """Definition of this reference in another document."""
+
+    def __init__(
+        self,
+        name: str = "",
+        slug: str = "",
+        kind: Optional[Division] = None,
+        values: Optional[List[int]] = None,
+        numerals: Optional[List[NumFormat]] = None,
+        defines: Optional[List[RefFormat]] = None,
+        refers: Optional[List[RefFormat]] = None,
+        parent: Optional[Ref] = None,
+        is_defined: bool = False,
+        resolved: Optional[Ref] = None,
+        level: Optional[Level] = None,
+    ) -> None:
+        """Construct a reference from a `level` or from lists of level parts."""
+        self.name = name
+        self.slug = slug
+        self.kind = kind or Section
+        self.level = level or Level.chain(
+            values or [], numerals or [], defines or [], refers or []
+        )
+        self.parent = parent
+        self.is_defined = is_defined
+        self.resolved = resolved
+        self.owner: Optional[Refs] = None
+        self.external: Optional[IndexEntry] = None
+        self._sections: Optional[str] = None  # see `cite_sections`
+
+    def __repr__(self) -> str:
+        """Return a short description of this reference."""
+        return f"Ref(kind={self.kind}, slug={self.slug!r}, cite={self.cite!r})"
+
+    @property
+    def levels(self) -> Tuple[Level, ...]:
+        """Citation levels from the top down (read-only; shared with parents)."""
+        return tuple(self.level.path()) if self.level else ()
+
+    @property
+    def values(self) -> Tuple[int, ...]:
+        """Citation numeral values (read-only; see `Refs.up`)."""
+        return tuple(level.value for level in self.levels)
+
+    @property
+    def numerals(self) -> Tuple[NumFormat, ...]:
+        """Citation numeral formats (read-only)."""
+        return tuple(level.numeral for level in self.levels if level.numeral)
+
+    @property
+    def defines(self) -> Tuple[RefFormat, ...]:
+        """Definition formats (read-only)."""
+        return tuple(level.define for level in self.levels if level.define)
+
+    @property
+    def refers(self) -> Tuple[RefFormat, ...]:
+        """Reference formats (read-only)."""
+        return tuple(level.refer for level in self.levels if level.refer)
 
     def copy(self) -> Ref:
-        """Return a copy of this reference."""
+        """Return a copy of this reference (levels are shared)."""
         return Ref(
             name=self.name,
             slug=self.slug,
             kind=self.kind,
-            values=self.values.copy(),
-            numerals=self.numerals.copy(),
-            defines=self.defines.copy(),
-            refers=self.refers.copy(),
             parent=self.parent,
+            level=self.level,
         )
 
     def update_slug(self, slug: str = "") -> Ref:
@@ -244,10 +430,7 @@ class Ref:
     @property
     def cite(self) -> str:
         """Return a citation (without the `kind`) to this reference."""
-        return "".join(
-            num(val, idx > 0)
-            for idx, (val, num) in enumerate(zip(self.values, self.numerals))
-        )
+        return self.level.cite if self.level else ""
 
     @property
     def above_below(self) -> str:
@@ -259,17 +442,25 @@ class Ref:
         if self.is_defined:
             raise Exception(f"{self.kind} {self.slug} already defined")
         self.is_defined = True
+        if self.owner:
+            self.owner.undefined_refs.pop(self.slug, None)
 
-        refer = self.kind.refer if len(self.refers) == 0 else self.refers[-1]
-        define = self.kind.define if len(self.defines) == 0 else self.defines[-1]
+        refer = (self.level and self.level.refer) or self.kind.refer
+        define = (self.level and self.level.define) or self.kind.define
         return f"""<span class="def" id="{self.slug}" data-kind="{self.kind}"
                     data-cite="{refer(self).strip()}">{define(self).strip()}</span>"""
 
     def refer(self) -> str:
         """Return a link to the reference definition."""
-        refer = self.kind.refer if len(self.refers) == 0 else self.refers[-1]
-        return f"""<a class="ref{'' if self.is_defined else ' not-defined'}"
-               href="#{self.slug}" data-kind="{self.kind}">{refer(self).strip()}</a>"""
+        if self.external and not self.is_defined:
+            href, doc, text = (self.external[k] for k in ("href", "document", "text"))
+            return f"""<a class="ref external" href="{href}"
+               data-kind="{self.kind}" data-document="{doc}">{text}</a>"""
+
+        ref = self.resolved if self.resolved and not self.is_defined else self
+        refer = (ref.level and ref.level.refer) or ref.kind.refer
+        return f"""<a class="ref{'' if ref.is_defined else ' not-defined'}"
+               href="#{ref.slug}" data-kind="{ref.kind}">{refer(ref).strip()}</a>"""
 
     __str__ = refer
 
@@ -283,8 +474,42 @@ class Refs:
     store: Dict[str, Ref]
     """Slugs mapped to references."""
 
-    def __init__(self) -> None:
-        """Construct a new reference manager."""
+    resolved: Dict[str, Ref]
+    """Slugs mapped to references from a previous rendering pass."""
+
+    undefined_refs: Dict[str, Ref]
+    """Slugs mapped to stored references that are not yet defined."""
+
+    kinds: Dict[str, Dict[str, Ref]]
+    """Division names mapped to the stored references of that kind."""
+
+    names: Dict[str, List[Ref]]
+    """Names mapped to the stored references with that name."""
+
+    index: RefIndex
+    """References exported from other documents."""
+
+    documents: Set[str]
+    """Documents whose `index` entries `see` looked up."""
+
+    suffixes: Dict[str, int]
+    """Slugs mapped to the last suffix used to make a duplicate unique."""
+
+    def __init__(
+        self,
+        resolved: Optional[Dict[str, Ref]] = None,
+        index: Optional[RefIndex] = None,
+    ) -> None:
+        """Construct a new reference manager.
+
+        Pass the `store` of a previous rendering pass as `resolved` so that
+        references to later definitions render their final citations.
+
+        Pass the `export` of other documents as `index` so that `see` can
+        refer to them with `doc=`.
+        """
+        self.resolved = resolved or {}
+        self.index = index or {}
         self.reset()
 
     def __str__(self) -> str:
@@ -295,12 +520,62 @@ class Refs:
         """Reset the references."""
         self.stack = []
         self.store = {}
+        self.undefined_refs = {}
+        self.kinds = {}
+        self.names = {}
+        self.suffixes = {}
+        self.documents = set()
         return self
 
+    def unique(self, slug: str) -> str:
+        """Return `slug` or, if it is already defined, `slug-2`, `slug-3`, etc."""
+        prev = self.store.get(slug)
+        if prev is None or not prev.is_defined:
+            return slug
+
+        num = self.suffixes.get(slug, 1)
+        while True:  # only loops if a heading already ends with the suffix
+            num += 1
+            result = f"{slug}-{num}"
+            prev = self.store.get(result)
+            if prev is None or not prev.is_defined:
+                self.suffixes[slug] = num
+                return result
+
+    def _store(self, ref: Ref) -> Ref:
+        """Store and index a reference (replacing one with the same slug)."""
+        prev = self.store.get(ref.slug)
+        if prev is not None and prev is not ref:
+            self.undefined_refs.pop(prev.slug, None)
+            self.kinds.get(prev.kind.name, {}).pop(prev.slug, None)
+            named = self.names.get(prev.name, [])
+            if prev in named:
+                named.remove(prev)
+            prev.owner = None
+
+        ref.owner = self
+        self.store[ref.slug] = ref
+        if not ref.is_defined and not ref.external:
+            self.undefined_refs[ref.slug] = ref
+        self.kinds.setdefault(ref.kind.name, {})[ref.slug] = ref
+        if prev is not ref:
+            self.names.setdefault(ref.name, []).append(ref)
+        return ref
+
     @property
     def undefined(self) -> List[Ref]:
         """References that were never defined."""
-        return [ref for ref in self.store.values() if not ref.is_defined]
+        return list(self.undefined_refs.values())
+
+    def of_kind(self, kind: Union[str, Division], defined: bool = False) -> List[Ref]:
+        """Return stored references of a `kind` (only `defined` ones, if given)."""
+        refs = self.kinds.get(str(kind), {}).values()
+        return [ref for ref in refs if ref.is_defined or not defined]
+
+    def named(self, name: str, kind: Union[str, Division, None] = None) -> List[Ref]:
+        """Return stored references with a `name` (and `kind`, if given)."""
+        refs = self.names.get(name, [])
+        return [ref for ref in refs if kind is None or ref.kind.name == str(kind)]
 
     @property
     def current(self) -> Ref:
@@ -310,12 +585,11 @@ class Refs:
     def ancestor(self, kind: Union[str, Division]) -> Ref:
         """Return the ancestor that matches the `kind`."""
         kind = Division.get(kind)
-        result = self.current
-        while result.parent:
-            if result.kind is kind:
-                return result
-            result = result.parent
-        return result
+        for ref in reversed(self.stack):
+            if ref.kind is kind:
+                return ref
+        root = self.stack[0].parent if self.stack else None
+        return root or Ref()
 
     def push(
         self,
@@ -326,24 +600,29 @@ class Refs:
         refer: Union[str, RefFormat, None] = None,
     ) -> Refs:
         """Add another level."""
-        level = self.current.copy()
-        level.parent = self.current
-        level.kind = Division.get(kind) or Section
-        level.values.append(0)
-        level.numerals.append(NumFormat.get(numeral or level.kind.numeral))
-        level.defines.append(RefFormat.get(define or level.kind.define))
-        level.refers.append(RefFormat.get(refer or level.kind.refer))
-        self.stack.append(level)
+        parent = self.current
+        kind = Division.get(kind) or Section
+        level = Level(
+            0,
+            NumFormat.get(numeral or kind.numeral),
+            RefFormat.get(define or kind.define),
+            RefFormat.get(refer or kind.refer),
+            parent.level,
+        )
+        self.stack.append(
+            Ref(parent.name, parent.slug, kind, parent=parent, level=level)
+        )
         return self
 
     def up(self, name: str = "", slug: str = "") -> str:
         """Increment current level."""
-        ref = self.current.copy()
-        ref.name = name
-        ref.values[-1] += 1
-        ref.update_slug(slug)  # needs name & values updated
+        current = self.current
+        level = cast(Level, current.level)  # `push` first
+        ref = Ref(name, kind=current.kind, parent=current.parent, level=level.next())
+        ref.update_slug(slug)  # needs name & level updated
+        ref.slug = self.unique(ref.slug)
         self.stack[-1] = ref
-        self.store[ref.slug] = ref
+        self._store(ref)
         return ref.define()
 
     def pop(self, num: int = 1) -> Refs:
@@ -357,19 +636,45 @@ class Refs:
     ## Short-hand
     def add(self, ref: Ref) -> Ref:
         """Add a ref to the store."""
-        self.store[ref.slug] = ref
-        return ref
+        return self._store(ref)
 
-    def see(self, name: str = "", kind: str = "Section", slug: str = "") -> Ref:
-        """Refer to a reference."""
+    def see(
+        self, name: str = "", kind: str = "Section", slug: str = "", doc: str = ""
+    ) -> Ref:
+        """Refer to a reference (in the `index` of document `doc`, if given)."""
         slug = slug or slugify(kind, name)
-        if slug in self.store:
-            return self.store[slug]
+        key = slugify(doc, slug) if doc else slug
+        if key in self.store:
+            return self.store[key]
 
         ref = Ref(name=name, kind=Division.get(kind), parent=self.current)
-        ref.update_slug(slug)
+        ref.update_slug(key)
+        if doc:
+            self.documents.add(doc)
+            ref.external = self.index.get(doc, {}).get(slugify(slug))
+        else:
+            prev = self.resolved.get(ref.slug)
+            if prev and prev.is_defined:
+                ref.resolved = prev
         return self.add(ref)
 
+    def export(self, document: str, href: str = "") -> Dict[str, IndexEntry]:
+        """Return this document's definitions for other documents' `index`."""
+        result: Dict[str, IndexEntry] = {}
+        for slug, ref in self.store.items():
+            if not ref.is_defined:
+                continue
+            refer = (ref.level and ref.level.refer) or ref.kind.refer
+            result[slug] = {
+                "kind": str(ref.kind),
+                "cite": ref.cite,
+                "name": ref.name,
+                "document": document,
+                "href": f"{href}#{slug}",
+                "text": refer(ref).strip(),
+            }
+        return result
+
     def term(self, name: str) -> Ref:
         """Refer to a terms."""
         return self.see(name, "Term")
@@ -0,0 +1,55 @@
+"""Test bounded caches."""
+
+# pkg
+from inkfill.cache import LRUCache
+
+
+def test_lru_cache() -> None:
+    """Evict least-recently-used items."""
+    cache: LRUCache[int, str] = LRUCache(10)
+    assert cache.get(1) is None
+    assert cache.get(1, "default") == "default"
+
+    cache.put(1, "aaaa")
+    cache.put(2, "bbbb")
+    assert 1 in cache and 2 in cache
+    assert cache.get(1) == "aaaa"  # 1 is now most-recently used
+
+    cache.put(3, "cccc")  # evicts 2
+    assert 2 not in cache
+    assert len(cache) == 2
+    assert cache.size == 8
+
+    cache.put(3, "cc")  # replace
+    assert cache.size == 6
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 2,
+        "items": 2,
+        "size": 6,
+        "max_size": 10,
+    }
+
+
+def test_lru_cache_too_big() -> None:
+    """Skip values larger than the cache."""
+    cache: LRUCache[int, str] = LRUCache(3)
+    assert cache.put(1, "abcd") == "abcd"
+    assert 1 not in cache
+    assert cache.size == 0
+
+
+def test_lru_cache_pop_clear() -> None:
+    """Remove items."""
+    cache: LRUCache[int, str] = LRUCache(10, sizeof=lambda _: 1)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.pop(1) == "a"
+    assert cache.pop(1) is None
+    assert cache.size == 1
+
+    cache.get(2)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size == 0
+    assert cache.hits == 1  # counters are kept
@@ -0,0 +1,25 @@
+"""Test document dependency tracking."""
+
+# pkg
+from inkfill.deps import DepGraph
+
+
+def test_dep_graph() -> None:
+    """Add, invalidate, and remove dependencies."""
+    graph = DepGraph()
+    graph.add(0, "config", "a.j2").add(1, "config", "b.j2")
+    assert graph.affected(["config"]) == {0, 1}
+    assert graph.affected(["b.j2", "missing"]) == {1}
+
+    assert graph.invalidate(["a.j2"]) == {0}
+    assert graph.version(0) == 1
+    assert graph.version(1) == 0
+    assert 0 not in graph.inputs
+    assert "a.j2" not in graph.users
+    assert graph.users["config"] == {1}
+
+    graph.remove(1)
+    assert graph.users == {}
+
+    graph.add(2, "c.j2").clear()
+    assert graph.inputs == {} and graph.users == {} and graph.versions == {}
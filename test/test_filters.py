@@ -2,16 +2,20 @@
 
 # std
 from datetime import datetime
+import json
 
 # pkg
+from inkfill import commafy
 from inkfill import compound
 from inkfill import day_month_year
 from inkfill import dollars
+from inkfill import format_column
 from inkfill import month_day_year
 from inkfill import nth_of_month_year
 from inkfill import one_or_many
 from inkfill import spell_number
 from inkfill import USD
+from inkfill import USD_many
 
 ## Dates
 
@@ -111,3 +115,23 @@ def test_dollars() -> None:
         "one hundred eleven dollars "
         "and eleven cents (US$11,111,111.11)"
     )
+
+
+## Columns
+
+
+class Column(list):  # type: ignore
+    """Stand-in for a NumPy array."""
+
+    def tolist(self) -> list:  # type: ignore
+        """Return a plain list."""
+        return list(self)
+
+
+def test_format_column() -> None:
+    """Format whole columns at once."""
+    assert format_column([], commafy) == []
+    assert format_column([1, 1.0, 1], commafy) == ["1", "1.0", "1"]
+    assert format_column([[1], {"a": 1}, [1]], json.dumps) == ["[1]", '{"a": 1}', "[1]"]
+    assert format_column(Column([1000, 2]), dollars) == [dollars(1000), dollars(2)]
+    assert USD_many([1, 2.5, 1], cents=True) == ["US$1.00", "US$2.50", "US$1.00"]
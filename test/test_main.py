@@ -3,9 +3,15 @@
 
 # std
 from pathlib import Path
+from threading import Thread
+import gzip
+import os
+import shutil
 
 # lib
 from webtest import TestApp
+import brotli
+import pytest
 
 # pkg
 from attrbox import AttrDict
@@ -15,6 +21,14 @@ PATH_EXAMPLES = Path(__file__).parent.parent / "src" / "inkfill" / "examples"
 """Path to examples directory."""
 
 
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep compiled templates out of the real `~/.cache/inkfill`."""
+    path = tmp_path / "inkfill-cache"
+    monkeypatch.setenv("INKFILL_CACHE", str(path))
+    return path
+
+
 def test_server() -> None:
     """Run the main endpoints."""
     app = TestApp(server.app)
@@ -25,4 +39,486 @@ def test_server() -> None:
     assert app.get("/").status_code == 200
     assert app.get("/doc/0").status_code == 200
     assert app.get("/static/inkfill.less").status_code == 200
+    assert "/css/inkfill.css" in app.get("/doc/0").text
     assert app.get("/does-not-exist", expect_errors=True).status_code == 404
+
+
+def test_stylesheet(tmp_path: Path) -> None:
+    """Serve LESS compiled to CSS."""
+    src = tmp_path / "src"
+    shutil.copytree(PATH_EXAMPLES / "corporate-letter", src)
+    (src / "custom.less").write_text("@c: red; p { a { color: @c; } }")
+
+    app = TestApp(server.app)
+    server.args = AttrDict(config=src / "letter.toml")
+    server.setup_config()
+    server.setup_jinja()
+
+    res = app.get("/css/inkfill.css")
+    assert res.content_type == "text/css"
+    assert '.def[data-kind="Term"]' in res.text
+    assert "p a" in app.get("/css/custom.css").text
+    assert app.get("/css/missing.css", expect_errors=True).status_code == 404
+    assert app.get("/css/../letter.css", expect_errors=True).status_code == 404
+
+
+def test_doc_conditional_get() -> None:
+    """Return 304 for unchanged documents and compress responses."""
+    app = TestApp(server.app)
+    server.args = AttrDict(config=PATH_EXAMPLES / "corporate-letter" / "letter.toml")
+    server.setup_config()
+    server.setup_jinja()
+
+    res = app.get("/doc/0")
+    etag = res.headers["ETag"]
+    assert res.headers["Vary"] == "Accept-Encoding"
+    assert "Content-Encoding" not in res.headers
+    assert app.get("/doc/0", headers={"If-None-Match": etag}).status_code == 304
+    assert app.get("/doc/0", headers={"If-None-Match": "*"}).status_code == 304
+    assert app.get("/doc/0", headers={"If-None-Match": '"other"'}).status_code == 200
+
+    res = app.get("/doc/0", headers={"Accept-Encoding": "gzip"})
+    assert res.headers["ETag"] == etag[:-1] + '-gzip"'
+    assert res.text == app.get("/doc/0").text  # webtest decodes gzip
+    assert gzip.decompress(server.compress(b"abc", "gzip")) == b"abc"
+
+    res2 = app.get("/doc/0", headers={"If-None-Match": res.headers["ETag"]})
+    assert res2.status_code == 200  # different encoding
+    assert brotli.decompress(server.compress(b"abc", "br")) == b"abc"
+
+
+def test_doc_stream() -> None:
+    """Stream documents while they render."""
+    app = TestApp(server.app)
+    server.args = AttrDict(config=PATH_EXAMPLES / "corporate-letter" / "letter.toml")
+    server.setup_config()
+    server.setup_jinja()
+    expected = app.get("/doc/0").text
+
+    server.args.stream = True
+    server.setup_config()
+    server.rendered.hits = 0
+    assert server.choose_encoding("br") == "identity"  # no streamed brotli
+
+    res = app.get("/doc/0", headers={"Accept-Encoding": "gzip"})
+    assert res.text == expected
+    assert app.get("/doc/0").text == expected
+    assert server.rendered.hits == 1  # cached after streaming
+
+    chunks = list(server.compress_stream([b"a" * 100, b"b" * 100], "gzip"))
+    assert b"".join(chunks) == server.compress(b"a" * 100 + b"b" * 100, "gzip")
+
+    server.rendered.max_size = 10  # too big to cache
+    server.setup_config()
+    assert app.get("/doc/0").text == expected
+    assert len(server.rendered) == 0
+    server.rendered.max_size = 64 * 2**20
+
+
+def test_choose_encoding() -> None:
+    """Negotiate a supported encoding."""
+    server.args = AttrDict(stream=False)
+    assert server.choose_encoding("") == "identity"
+    assert server.choose_encoding("deflate") == "identity"
+    assert server.choose_encoding("gzip;q=0") == "identity"
+    assert server.choose_encoding("gzip;q=bad") == "identity"
+    assert server.choose_encoding("gzip;q=0.5") == "gzip"
+    assert server.choose_encoding("*") == "br"
+    assert server.choose_encoding("br;q=0, *") == "gzip"
+
+
+def test_get_doc() -> None:
+    """Reuse document configs until the config is reloaded."""
+    server.args = AttrDict(config=PATH_EXAMPLES / "corporate-letter" / "letter.toml")
+    server.setup_config()
+    server.setup_jinja()
+
+    doc = server.get_doc(0)
+    assert doc.title == "Example Letter"
+    assert server.get_doc(0) is doc
+
+    server.setup_config()
+    assert server.get_doc(0) is not doc
+
+
+def test_compile_templates(tmp_path: Path) -> None:
+    """Precompile templates into the bytecode cache."""
+    src = tmp_path / "src"
+    shutil.copytree(PATH_EXAMPLES / "corporate-letter", src)
+    (src / "broken.html.j2").write_text("{% if %}")
+
+    cache = tmp_path / "cache"
+    server.args = AttrDict(config=src / "letter.toml", cache_dir=str(cache))
+    server.setup_jinja()
+
+    names = server.compile_templates()
+    assert "letter.html.j2" in names
+    assert "inkfill-base.html.j2" in names
+    assert "broken.html.j2" not in names
+    assert len(list(cache.glob("__jinja2_*.cache"))) >= len(names)
+
+
+def test_check_config(tmp_path: Path) -> None:
+    """Reload the config when it or an import changes."""
+    src = tmp_path / "src"
+    shutil.copytree(PATH_EXAMPLES / "corporate-letter", src)
+
+    server.args = AttrDict(config=src / "letter.toml")
+    server.setup_config()
+    server.setup_jinja()
+    watcher = server.setup_watcher()
+    assert src / "letter.toml" in watcher.files
+
+    doc = server.get_doc(0)
+    server.check_config({src / "letter.html.j2"})  # template only
+    assert server.get_doc(0) is doc
+
+    server.check_config({src / "letter.toml"})
+    assert server.get_doc(0) is not doc
+
+
+def test_reload_config(tmp_path: Path) -> None:
+    """Invalidate only the documents affected by a change."""
+    config = tmp_path / "config.toml"
+    (tmp_path / "a.toml").write_text('extra = "a"\n')
+    (tmp_path / "a.html.j2").write_text("{{ config.name }} {{ config.extra }}")
+    (tmp_path / "b.html.j2").write_text("{{ config.name }}")
+    lines = [
+        'name = "Top"',
+        "shared = [1, 2]",
+        "[[document]]",
+        'template = "a.html.j2"',
+        'imports = ["a.toml"]',
+        "[[document]]",
+        'template = "b.html.j2"',
+        'name = "B"',
+    ]
+    config.write_text("\n".join(lines))
+
+    app = TestApp(server.app)
+    server.args = AttrDict(config=config)
+    server.setup_config()
+    server.setup_jinja()
+    assert app.get("/doc/0").text == "Top a"
+    assert app.get("/doc/1").text == "B"
+    assert server.graph.users[("key", "name")] == {0}  # overridden by 1
+
+    # unrelated file
+    assert server.reload_config({tmp_path / "other.toml"}) == set()
+
+    # top-level key that only one document sees
+    text = "\n".join(lines)
+    text = text.replace('"Top"', '"Changed"')
+    config.write_text(text)
+    assert server.reload_config({config}) == {0}
+    assert app.get("/doc/0").text == "Changed a"
+
+    # shared top-level key
+    text = text.replace("[1, 2]", "[3]")
+    config.write_text(text)
+    assert server.reload_config({config}) == {0, 1}
+    app.get("/doc/0")
+    app.get("/doc/1")
+
+    # document entry
+    text = text.replace('"B"', '"Bee"')
+    config.write_text(text)
+    assert server.reload_config({config}) == {1}
+    assert app.get("/doc/1").text == "Bee"
+
+    # new top-level key that no document has used yet
+    text = 'footer = "F"\n' + text
+    config.write_text(text)
+    assert server.reload_config({config}) == {0, 1}
+    assert server.get_doc(0).footer == "F"
+    app.get("/doc/1")
+
+    # imported file
+    (tmp_path / "a.toml").write_text('extra = "aa"\n')
+    assert server.reload_config({tmp_path / "a.toml"}) == {0}
+    assert app.get("/doc/0").text == "Changed aa"
+
+    # document removed
+    config.write_text("\n".join(text.split("\n")[:-3]))
+    assert server.reload_config({config}) == {1}
+
+
+def test_convert_nested_str() -> None:
+    """Only compile strings that are templates."""
+    server.args = AttrDict(config=PATH_EXAMPLES / "corporate-letter" / "letter.toml")
+    server.setup_jinja()
+
+    data = {"a": "plain", "b": ["{{ a }}!", "{{ a }}!"], "c": "x\n", "d": 1}
+    assert server.convert_nested_str(data, data) == {
+        "a": "plain",
+        "b": ["plain!", "plain!"],
+        "c": "x",  # same as jinja
+        "d": 1,
+    }
+    assert not server.is_template("plain\ntext")
+    info = server.compile_str.cache_info()
+    assert info.hits == 1
+    assert info.currsize == 2
+
+
+def test_doc_cache(tmp_path: Path) -> None:
+    """Cache rendered documents until an input changes."""
+    src = tmp_path / "src"
+    shutil.copytree(PATH_EXAMPLES / "corporate-letter", src)
+
+    app = TestApp(server.app)
+    server.args = AttrDict(config=src / "letter.toml")
+    server.setup_config()
+    server.setup_jinja()
+    server.rendered.hits = server.rendered.misses = 0
+
+    first = app.get("/doc/0").text
+    assert app.get("/doc/0").text == first
+    assert app.get("/cache").json["hits"] == 1
+    assert {
+        src / "letter.toml",  # imports itself
+        src / "letter.html.j2",
+        server.PATH_VIEWS / "inkfill-base.html.j2",
+    } < server.graph.inputs[0]
+
+    template = src / "letter.html.j2"
+    template.write_text(template.read_text().replace("Roman", "ROMAN"))
+    stat = template.stat()
+    os.utime(template, (stat.st_atime, stat.st_mtime + 10))
+    assert "ROMAN" in app.get("/doc/0").text
+    assert server.rendered.stats()["misses"] == 2
+
+
+def test_build(tmp_path: Path) -> None:
+    """Render every document to a file."""
+    server.args = AttrDict(
+        config=PATH_EXAMPLES / "corporate-letter" / "letter.toml",
+        out=tmp_path,
+        jobs="1",
+    )
+    server.setup_config()
+    server.setup_jinja()
+
+    paths = server.build()
+    assert paths == [tmp_path / "example-letter.html"]
+    assert "MMXLVII" in paths[0].read_text()
+    assert (tmp_path / "static" / "inkfill.js").exists()
+    assert (tmp_path / "css" / "inkfill.css").exists()
+
+
+def test_build_parallel(tmp_path: Path) -> None:
+    """Render documents in a process pool."""
+    src = tmp_path / "src"
+    shutil.copytree(PATH_EXAMPLES / "corporate-letter", src)
+    with (src / "letter.toml").open("a") as f:
+        f.write('\n[[document]]\ntemplate = "letter.html.j2"\n')
+        f.write('output = "copy.html"\nnumber = 2047\n')
+
+    out = tmp_path / "out"
+    server.args = AttrDict(config=src / "letter.toml", out=out, jobs="2")
+    server.setup_config()
+    server.setup_jinja()
+
+    paths = server.build()
+    assert paths == [out / "example-letter.html", out / "copy.html"]
+    assert all("MMXLVII" in path.read_text() for path in paths)
+
+    with (src / "letter.toml").open("a") as f:
+        f.write('\n[[document]]\ntemplate = "letter.html.j2"\n')
+        f.write('output = "copy.html"\n')
+    server.setup_config()
+    with pytest.raises(ValueError, match="documents 1 and 2 both write"):
+        server.build()
+
+
+def test_two_pass(tmp_path: Path) -> None:
+    """Resolve forward references on the server."""
+    config = tmp_path / "config.toml"
+    (tmp_path / "a.html.j2").write_text(
+        "{{ xref.see('Definitions').refer() }}{{ xref.push().up('Definitions') }}"
+    )
+    config.write_text('[[document]]\ntemplate = "a.html.j2"\n')
+
+    app = TestApp(server.app)
+    server.args = AttrDict(config=config)
+    server.setup_config()
+    server.setup_jinja()
+    html = app.get("/doc/0").text
+    assert "not-defined" in html
+
+    server.args.two_pass = True
+    server.setup_config()
+    html = app.get("/doc/0").text
+    assert "not-defined" not in html
+    assert ">Section 1</a>" in html
+    server.args.two_pass = False
+
+
+def test_ref_index(tmp_path: Path) -> None:
+    """Refer to definitions in other documents."""
+    config = tmp_path / "config.toml"
+    (tmp_path / "master.html.j2").write_text(
+        "{{ xref.push().up() }}{{ xref.push().up('Payment') }}"
+        "{{ xref.see('Scope', doc='exhibit-a') }}"
+    )
+    (tmp_path / "exhibit.html.j2").write_text(
+        "{{ xref.push().up('Scope') }}{{ xref.see('Payment', doc='master-agreement') }}"
+    )
+    config.write_text(
+        '[[document]]\ntemplate = "master.html.j2"\ntitle = "Master Agreement"\n'
+        '[[document]]\ntemplate = "exhibit.html.j2"\ntitle = "Exhibit A"\n'
+    )
+
+    app = TestApp(server.app)
+    server.args = AttrDict(config=config, refs=tmp_path / "refs")
+    server.setup_config()
+    server.setup_jinja()
+    res = app.get("/doc/1")
+    assert "not-defined" in res.text
+    etag = res.headers["ETag"]
+    assert app.get("/doc/1").headers["ETag"] == etag  # cached with the index input
+
+    app.get("/doc/0")
+    index = server.load_refs()
+    assert index["master-agreement"]["section-payment"]["cite"] == "1.1"
+
+    res = app.get("/doc/1", headers={"If-None-Match": etag})
+    assert res.status_code == 200 and res.headers["ETag"] != etag
+    html = res.text
+    assert 'href="/doc/0#section-payment"' in html
+    assert ">Section 1.1</a>" in html
+
+    # documents that cite each other settle instead of invalidating each other
+    app.get("/doc/0")
+    misses = server.rendered.misses
+    for _ in range(3):
+        app.get("/doc/0")
+        app.get("/doc/1")
+    assert server.rendered.misses == misses
+
+
+def test_merge(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """Render one document per data row."""
+    config = tmp_path / "config.toml"
+    (tmp_path / "a.html.j2").write_text("{{ config.greeting }} {{ config.to.name }}")
+    config.write_text(
+        "\n".join(
+            [
+                'title = "Letter"',
+                'greeting = "Dear"',
+                "[[document]]",
+                'template = "a.html.j2"',
+                "to = { name = 'Nobody', city = 'Nowhere' }",
+            ]
+        )
+    )
+    data = tmp_path / "rows.csv"
+    data.write_text("to.name,greeting\nAda,Hi\nBob,{{ to.name }}:\n")
+
+    server.args = AttrDict(config=config, data=data, doc="0", out=tmp_path / "out")
+    server.setup_config()
+    server.setup_jinja()
+    assert server.merge() == 2
+    assert (tmp_path / "out" / "letter-1.html").read_text() == "Hi Ada"
+    assert (tmp_path / "out" / "letter-2.html").read_text() == "Bob: Bob"
+    assert server.get_doc(0).to.name == "Nobody"  # base is unchanged
+
+    data = tmp_path / "rows.jsonl"
+    data.write_text('{"to": {"name": "Cy"}}\n\n{"output": "d.html"}\n')
+    server.args.data = data
+    assert server.merge() == 2
+    assert (tmp_path / "out" / "letter-1.html").read_text() == "Dear Cy"
+    assert (tmp_path / "out" / "d.html").read_text() == "Dear Nobody"
+    capsys.readouterr()
+
+    server.args.stdout = True
+    assert server.merge() == 2
+    assert capsys.readouterr().out == "Dear CyDear Nobody"
+
+
+def test_merge_row() -> None:
+    """Overlay nested row values without dropping sibling keys."""
+    base = AttrDict(name="Acme", to=AttrDict(name="Nobody", city="Nowhere"))
+    doc = server.merge_row(base, {"to": {"name": "{{ name }} Cy"}})
+    assert doc.to == {"name": "Acme Cy", "city": "Nowhere"}
+    assert base.to.name == "Nobody"  # base is unchanged
+
+
+def test_server_timing() -> None:
+    """Report request phases in a `Server-Timing` header."""
+    app = TestApp(server.app)
+    server.args = AttrDict(config=PATH_EXAMPLES / "corporate-letter" / "letter.toml")
+    server.setup_config()
+    server.setup_jinja()
+
+    res = app.get("/doc/0")
+    phases = [item.split(";")[0] for item in res.headers["Server-Timing"].split(", ")]
+    assert phases[0] == "cache"
+    assert {"merge", "convert", "template", "render", "total"} <= set(phases)
+
+    res = app.get("/doc/0")  # cached
+    assert "render" not in res.headers["Server-Timing"]
+    assert "Server-Timing" not in app.get("/").headers  # memoized configs
+
+    server.setup_config()
+    assert "convert;dur=" in app.get("/").headers["Server-Timing"]
+    assert "Server-Timing" not in app.get("/cache").headers
+
+
+def test_profile(capsys: pytest.CaptureFixture[str]) -> None:
+    """Report where render time goes."""
+    server.args = AttrDict(
+        config=PATH_EXAMPLES / "corporate-letter" / "letter.toml", profile=True
+    )
+    server.setup_config()
+    server.setup_jinja()
+    expected = "".join(server.render_stream(server.get_doc(0)))
+    html = server.render(server.get_doc(0))
+    assert html == expected
+
+    out = capsys.readouterr().out
+    assert "[inkfill] profile of letter.html.j2:" in out
+    assert "template" in out and "inkfill-base.html.j2" in out
+    assert "block" in out and "letter.html.j2:content" in out
+    assert "filter" in out
+    assert not server.renderer.profiler.stats  # reset after reporting
+
+    profiler = server.renderer.profiler
+    profiler.add(("call", "main"), 1.0)
+    thread = Thread(target=profiler.add, args=(("call", "other"), 1.0))
+    thread.start()
+    thread.join()
+    assert list(profiler.stats) == [("call", "main")]  # other threads don't mix in
+    profiler.reset()
+
+    server.args.profile = False
+    server.setup_jinja()
+    assert server.render(server.get_doc(0)) == html
+    assert capsys.readouterr().out == ""
+
+
+def test_format_column(tmp_path: Path) -> None:
+    """Format a column of values in a template."""
+    config = tmp_path / "config.toml"
+    (tmp_path / "a.html.j2").write_text(
+        "{{ config.amounts | format_column('USD', true) | join(';') }} "
+        "{{ config.amounts | format_column('num_format', 'upper-roman') | join }}"
+    )
+    config.write_text('amounts = [1, 2, 1]\n[[document]]\ntemplate = "a.html.j2"\n')
+    server.args = AttrDict(config=config)
+    server.setup_config()
+    server.setup_jinja()
+    assert server.render(server.get_doc(0)) == "US$1.00;US$2.00;US$1.00 IIII"
+
+
+def test_find_templates(tmp_path: Path) -> None:
+    """Parse each template file once per modification."""
+    (tmp_path / "base.j2").write_text("base")
+    (tmp_path / "page.j2").write_text('{% extends "base.j2" %}')
+    server.args = AttrDict(config=tmp_path / "config.toml")
+    server.setup_jinja()
+
+    expected = [tmp_path / "page.j2", tmp_path / "base.j2"]
+    assert server.find_templates("page.j2") == expected
+    assert server.find_templates("page.j2") == expected
+    assert server.referenced_templates.cache_info().hits == 2
@@ -11,6 +11,7 @@ from inkfill import to_nth
 from inkfill import to_ordinal
 from inkfill import to_roman
 from inkfill import NumFormat
+from inkfill import numerals
 from inkfill.numerals import DECIMAL
 
 
@@ -183,3 +184,52 @@ def test_numeral() -> None:
 
     with pytest.raises(Exception):
         NumFormat("decimal", to_decimal).add()  # already exists
+
+
+def test_numeral_tables() -> None:
+    """Precomputed numerals match computed ones."""
+    assert numerals.ALPHA_TABLE[1] == "A"
+    assert numerals.ROMAN_TABLE[4] == "IV"
+    for num in [1, 26, 27, 702, 703, numerals.TABLE_SIZE - 1]:
+        assert to_alpha(num) == numerals._alpha(num)
+        assert to_roman(num) == numerals._roman(num)
+
+    # past the tables
+    assert to_alpha(numerals.TABLE_SIZE) == "GJH"
+    assert to_roman(numerals.TABLE_SIZE) == "MMMMM"
+    assert to_roman(5999) == "MMMMMCMXCIX"
+
+    # memoized
+    upper = NumFormat.get("upper-roman")
+    assert upper.render(12, True) == upper.render(12, True) == "XII"
+    assert upper.cache[(int, 12, True)] == "XII"
+
+
+def test_cardinal_large() -> None:
+    """Arbitrarily large cardinal and ordinal numerals."""
+    decillion = 10**33
+    assert to_cardinal(decillion**2) == "one decillion decillion"
+    assert to_cardinal(decillion**2 + 7 * decillion) == "one decillion seven decillion"
+    assert to_cardinal(-(10**36) - 1) == "negative one thousand decillion one"
+    assert to_ordinal(10**36) == "one thousand decillionth"
+    assert to_ordinal(-21_000_002) == "negative twenty-one million second"
+    assert to_cardinal(10**6000).endswith("decillion")  # beyond int -> str limit
+
+    numerals.NAME_ILLIONS[12] = "undecillion"
+    try:
+        assert to_cardinal(10**36) == "one undecillion"
+        assert to_ordinal(10**36) == "one undecillionth"
+    finally:
+        del numerals.NAME_ILLIONS[12]
+
+
+def test_render_many() -> None:
+    """Render a column of numerals."""
+    lower = NumFormat.get("lower-alpha")
+    assert lower.render_many([]) == []
+    assert lower.render_many(range(1, 4), True) == ["(a)", "(b)", "(c)"]
+
+    decimal = NumFormat.get("decimal")
+    assert decimal(1) == "1"
+    assert decimal(1.0) == "1.0"  # type: ignore[arg-type]
+    assert decimal(True) == "True"  # not memoized as `1`
@@ -433,3 +433,14 @@ def test_plural_determiners() -> None:
 def test_plural_other() -> None:
     """Other plurals."""
     assert plural("yo-yo") == "yo-yos"
+
+
+def test_plural_rules() -> None:
+    """Earlier rules win over longer suffixes."""
+    assert plural("polis") == "poleis"  # before -is
+    assert plural("index") == "indices"
+    assert plural("soliloquy") == "soliloquies"
+    assert plural("key") == "keys"
+    assert plural("word") == "words"  # no rule
+    assert plural("word") == "words"  # cached
+    assert plural.cache_info().hits > 0
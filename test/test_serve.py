@@ -0,0 +1,41 @@
+"""Test concurrent server."""
+
+# std
+from threading import Event
+from threading import Thread
+from time import sleep
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import List
+from urllib.request import urlopen
+
+# pkg
+from inkfill.serve import ThreadedServer
+
+
+def test_threaded_server() -> None:
+    """Handle requests concurrently."""
+    release = Event()
+
+    def app(environ: Any, start_response: Callable[..., Any]) -> Iterable[bytes]:
+        if environ["PATH_INFO"] == "/slow":
+            release.wait(5)
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [environ["PATH_INFO"].encode()]
+
+    adapter = ThreadedServer(host="127.0.0.1", port=0, quiet=True, workers=2)
+    Thread(target=adapter.run, args=(app,), daemon=True).start()
+    while not adapter.server:
+        sleep(0.01)
+    url = f"http://127.0.0.1:{adapter.server.server_address[1]}"
+
+    results: List[bytes] = []
+    slow = Thread(target=lambda: results.append(urlopen(f"{url}/slow").read()))
+    slow.start()
+    assert urlopen(f"{url}/fast", timeout=5).read() == b"/fast"  # not blocked
+    release.set()
+    slow.join(5)
+    assert results == [b"/slow"]
+
+    adapter.server.shutdown()
@@ -0,0 +1,64 @@
+"""Test file watching."""
+
+# std
+from pathlib import Path
+from threading import Event
+from typing import List
+from typing import Set
+import os
+
+# lib
+import pytest
+
+# pkg
+from inkfill.watch import Watcher
+
+
+def touch(path: Path, offset: float) -> None:
+    """Write to a file and bump its mtime."""
+    path.write_text(f"{offset}")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + offset))
+
+
+@pytest.mark.parametrize("polling", [True, False])
+def test_watcher(tmp_path: Path, polling: bool) -> None:
+    """Report debounced changes to watched paths."""
+    (tmp_path / "views").mkdir()
+    config = tmp_path / "config.toml"
+    other = tmp_path / "other.toml"
+    template = tmp_path / "views" / "doc.html.j2"
+    for path in [config, other, template]:
+        path.write_text("")
+
+    calls: List[Set[Path]] = []
+    done = Event()
+
+    def on_change(paths: Set[Path]) -> None:
+        calls.append(paths)
+        done.set()
+
+    watcher = Watcher(on_change, debounce=0.2, interval=0.05, polling=polling)
+    watcher.watch([config, template, tmp_path / "missing.toml"])
+    assert watcher.is_watched(template.resolve())
+    assert not watcher.is_watched(other.resolve())
+
+    watcher.start()
+    try:
+        touch(other, 10)  # ignored
+        touch(config, 10)
+        touch(template, 10)
+        touch(config, 20)
+        assert done.wait(5)
+    finally:
+        watcher.stop()
+
+    assert calls == [{config.resolve(), template.resolve()}]
+
+
+def test_watcher_flush() -> None:
+    """Flushing without changes does nothing."""
+    calls: List[Set[Path]] = []
+    watcher = Watcher(calls.append, polling=True)
+    watcher.flush()
+    assert calls == []
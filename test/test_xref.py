@@ -9,6 +9,7 @@ from inkfill import RefFormat
 from inkfill import Division
 from inkfill import Refs
 from inkfill import slugify
+from inkfill.xref import cite_sections
 from inkfill.numerals import DECIMAL
 from inkfill.numerals import LOWER_ALPHA
 
@@ -121,3 +122,107 @@ def test_refs_term_see() -> None:
 
     ref3 = refs.see("Corporation", kind="Term")
     assert ref3 is ref
+
+
+def test_refs_resolved() -> None:
+    """Forward references resolved by a previous pass."""
+
+    def render(refs: Refs) -> str:
+        html = refs.see("Definitions").refer()
+        refs.push().up("Definitions")
+        refs.pop()
+        return html
+
+    first = Refs()
+    html = render(first)
+    assert "not-defined" in html
+    assert ">Section<" in html
+
+    second = Refs(resolved=first.store)
+    html = render(second)
+    assert "not-defined" not in html
+    assert ">Section 1<" in html
+    assert second.undefined == []
+
+
+def test_refs_shared_levels() -> None:
+    """References share the levels above them."""
+    refs = Refs()
+    refs.push().up("One")
+    one = refs.current
+    refs.push("Paragraph").up("A")
+    refs.up("B")
+    a, b = refs.store["paragraph-a"], refs.current
+    assert b.cite == "1(b)" and a.cite == "1(a)"
+    assert b.values == (1, 2) and b.numerals == (DECIMAL, LOWER_ALPHA)
+    with pytest.raises(TypeError):
+        b.values[-1] += 1  # type: ignore[index]
+    assert a.level and b.level and a.level.prev is b.level.prev is one.level
+    assert b.copy().level is b.level
+    assert "cite=" in repr(b)
+
+
+def test_refs_cached_cites() -> None:
+    """Citations are cached and built on the level above."""
+    refs = Refs()
+    refs.push("Article").up("One")
+    refs.push().up("Two")
+    refs.push("Paragraph").up("A")
+    a = refs.current
+    assert a.cite == "I.1(a)" and a.level and a.level._cite == "I.1(a)"
+    assert a.level.prev and a.level.prev._cite == "I.1"
+    assert cite_sections(a) == "1(a)" and a._sections == "1(a)"
+
+
+def test_refs_indexes() -> None:
+    """Undefined, kind, and name indexes stay up to date."""
+    refs = Refs()
+    early = refs.see("Scope")
+    term = refs.term("Buyer")
+    assert refs.undefined == [early, term]
+
+    refs.push().up("Scope")  # replaces the early reference
+    scope = refs.current
+    assert refs.undefined == [term]
+    assert refs.of_kind("Section") == [scope]
+    assert refs.named("Scope") == [scope]
+
+    term.define()
+    assert refs.undefined == []
+    assert refs.of_kind("Term", defined=True) == [term]
+    assert refs.named("Buyer", "Section") == []
+    assert refs.ancestor("Section") is scope
+
+
+def test_refs_export() -> None:
+    """Refer to definitions exported from another document."""
+    master = Refs()
+    master.push().up()
+    master.push().up("Payment")
+    index = {"master": master.export("master", "master.html")}
+    entry = index["master"]["section-payment"]
+    assert entry["cite"] == "1.1" and entry["href"] == "master.html#section-payment"
+
+    refs = Refs(index=index)
+    ref = refs.see("Payment", doc="master")
+    assert refs.see("Payment", doc="master") is ref
+    assert 'href="master.html#section-payment"' in ref.refer()
+    assert ">Section 1.1</a>" in ref.refer()
+    assert refs.undefined == []
+    assert "not-defined" in refs.see("Missing", doc="master").refer()
+
+
+def test_refs_unique_slugs() -> None:
+    """Duplicate headings get numbered slugs instead of replacing each other."""
+    refs = Refs()
+    early = refs.see("Notices")
+    refs.push().up("Notices")
+    first = refs.current
+    assert refs.undefined == [] and early.owner is None  # forward reference
+
+    refs.up("Notices")
+    refs.up("Notices")
+    second, third = refs.store["section-notices-2"], refs.current
+    assert third.slug == "section-notices-3"
+    assert refs.store["section-notices"] is first
+    assert second.is_defined and refs.suffixes == {"section-notices": 3}